@@ -0,0 +1,210 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+"""
+Persistent caches for downloaded data.
+"""
+import os
+import re
+import json
+import zlib
+import time
+import hashlib
+import threading
+from .output import out
+from .fileutil import write_file
+
+# Maximum size of all cached pages
+MaxPageCacheBytes = 1024 * 1024 * 100 # 100 MB
+
+# Time to keep robots.txt files if the server does not specify it
+RobotsTxtCacheSecs = 60 * 60 * 24
+
+
+def getCacheDir():
+    """Get the default directory for cache files."""
+    if os.name == 'nt':
+        basedir = os.environ.get('LOCALAPPDATA') or os.environ.get('APPDATA')
+    else:
+        basedir = os.environ.get('XDG_CACHE_HOME')
+    if not basedir:
+        basedir = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(basedir, 'dosage')
+
+
+def getCacheKey(key):
+    """Get a hash value usable as filename for the given key."""
+    if not isinstance(key, bytes):
+        key = key.encode('utf-8')
+    return hashlib.sha1(key).hexdigest()
+
+
+class PageCache(object):
+    """Store page contents together with their ETag and Last-Modified
+    HTTP headers on disk. When the total size exceeds the maximum, the
+    least recently used entries are removed."""
+
+    def __init__(self, directory, maxbytes=MaxPageCacheBytes):
+        """Set cache directory and maximum size."""
+        self.directory = directory
+        self.maxbytes = maxbytes
+        # total size of cache files, determined on first write
+        self.size = None
+        self.lock = threading.Lock()
+
+    def getFilename(self, url):
+        """Get cache filename for given URL."""
+        return os.path.join(self.directory, getCacheKey(url))
+
+    def get(self, url):
+        """Get cache entry for given URL.
+        @return: None or dictionary with keys url, etag, lastmodified and text
+        @rtype: dict or None
+        """
+        fn = self.getFilename(url)
+        try:
+            with open(fn, 'rb') as f:
+                entry = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+            # mark entry as recently used
+            os.utime(fn, None)
+        except (IOError, OSError, ValueError, zlib.error):
+            return None
+        if entry.get('url') != url:
+            return None
+        return entry
+
+    def put(self, url, etag, lastmodified, text):
+        """Store page text with its validator headers."""
+        entry = dict(url=url, etag=etag, lastmodified=lastmodified, text=text)
+        data = zlib.compress(json.dumps(entry).encode('utf-8'))
+        fn = self.getFilename(url)
+        try:
+            with self.lock:
+                if not os.path.isdir(self.directory):
+                    os.makedirs(self.directory)
+                if self.size is None:
+                    self.size = sum(size for fn, size, mtime in self.getEntries())
+                elif os.path.exists(fn):
+                    self.size -= os.path.getsize(fn)
+                write_file(fn, data)
+                self.size += len(data)
+                if self.size > self.maxbytes:
+                    self.evict()
+        except (IOError, OSError) as msg:
+            out.warn("Could not write page cache entry %s: %s" % (fn, msg))
+
+    def getEntries(self):
+        """Get filename, size and modification time of all cache files."""
+        for name in os.listdir(self.directory):
+            fn = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(fn)
+            except OSError:
+                continue
+            yield fn, stat.st_size, stat.st_mtime
+
+    def evict(self):
+        """Remove least recently used entries until the cache size is below
+        90% of the maximum."""
+        entries = sorted(self.getEntries(), key=lambda entry: entry[2])
+        self.size = sum(size for fn, size, mtime in entries)
+        maxbytes = self.maxbytes * 9 // 10
+        for fn, size, mtime in entries:
+            if self.size <= maxbytes:
+                break
+            try:
+                os.remove(fn)
+                self.size -= size
+            except OSError:
+                pass
+        out.debug("Page cache size is now %d bytes" % self.size)
+
+
+_maxage = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+def getMaxAge(headers, default):
+    """Get the number of seconds a response may be cached according to
+    its Cache-Control header."""
+    cachecontrol = headers.get('cache-control', '').lower()
+    if 'no-store' in cachecontrol or 'no-cache' in cachecontrol:
+        return 0
+    mo = _maxage.search(cachecontrol)
+    if mo:
+        return int(mo.group(1))
+    return default
+
+
+class RobotsCache(object):
+    """Store robots.txt rules on disk until they expire."""
+
+    def __init__(self, directory, maxage=RobotsTxtCacheSecs):
+        """Set cache directory and default expiration time in seconds."""
+        self.directory = directory
+        self.maxage = maxage
+
+    def getFilename(self, url):
+        """Get cache filename for given robots.txt URL."""
+        return os.path.join(self.directory, getCacheKey(url))
+
+    def get(self, url):
+        """Get cached robots.txt info of given URL if it is not expired.
+        @return: None or dictionary with keys url, status, lines and expires
+        @rtype: dict or None
+        """
+        try:
+            with open(self.getFilename(url), 'rb') as f:
+                entry = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+        if entry.get('url') != url or entry.get('expires', 0) < time.time():
+            return None
+        return entry
+
+    def put(self, url, status, lines, headers):
+        """Store HTTP status and robots.txt lines of given URL, unless the
+        Cache-Control header of the response forbids it. Server errors and
+        rate limit responses are temporary and not stored."""
+        if status == 429 or status >= 500:
+            return
+        maxage = getMaxAge(headers, self.maxage)
+        if maxage <= 0:
+            return
+        entry = dict(url=url, status=status, lines=lines, expires=time.time() + maxage)
+        fn = self.getFilename(url)
+        try:
+            if not os.path.isdir(self.directory):
+                try:
+                    os.makedirs(self.directory)
+                except OSError:
+                    # another thread could have created the directory
+                    if not os.path.isdir(self.directory):
+                        raise
+            write_file(fn, json.dumps(entry).encode('utf-8'))
+        except (IOError, OSError) as msg:
+            out.warn("Could not write robots.txt cache entry %s: %s" % (fn, msg))
+
+
+_pagecache = None
+
+def setPageCache(pagecache):
+    """Set the page cache used when downloading pages, or None to
+    disable caching."""
+    global _pagecache
+    _pagecache = pagecache
+
+
+def getPageCache():
+    """Get the page cache or None if caching is disabled."""
+    return _pagecache
+
+
+_robotscache = None
+
+def setRobotsCache(robotscache):
+    """Set the cache for robots.txt files, or None to disable caching."""
+    global _robotscache
+    _robotscache = robotscache
+
+
+def getRobotsCache():
+    """Get the robots.txt cache or None if caching is disabled."""
+    return _robotscache
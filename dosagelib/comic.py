@@ -2,9 +2,13 @@
 # Copyright (C) 2004-2005 Tristan Seligmann and Jonathan Jacobs
 # Copyright (C) 2012-2013 Bastian Kleineidam
 import os
+import time
+import hashlib
 
 from .output import out
-from .util import getImageObject, normaliseURL, unquote, strsize, getDirname, getFilename
+from .util import (getImageObject, normaliseURL, unquote, strsize, getDirname,
+  getFilename, getRetryPause, MaxImageBytes, MaxRetries)
+from .fileutil import rename, make_tempfile, Syncer
 from .events import getHandler
 
 class ComicStrip(object):
@@ -37,6 +41,9 @@ class ComicImage(object):
 
     ChunkBytes = 1024 * 100 # 100KB
 
+    # File extensions of common image MIME types, see connect()
+    ImageExtensions = ('.jpg', '.png', '.gif', '.bmp')
+
     def __init__(self, name, url, referrer, dirname, filename, session):
         """Set URL and filename."""
         self.name = name
@@ -46,10 +53,22 @@ class ComicImage(object):
         filename = getFilename(filename)
         self.filename, self.ext = os.path.splitext(filename)
         self.session = session
+        # SHA-1 hex digest of the saved image content
+        self.sha1 = None
 
     def connect(self):
-        """Connect to host and get meta information."""
+        """Connect to host and get meta information. The response must be
+        closed to release its connection."""
         self.urlobj = getImageObject(self.url, self.referrer, self.session)
+        try:
+            self.checkHeaders()
+        except:
+            self.urlobj.close()
+            raise
+
+    def checkHeaders(self):
+        """Check the content type and get the file extension and content
+        length from the response headers."""
         content_type = unquote(self.urlobj.headers.get('content-type', 'application/octet-stream'))
         content_type = content_type.split(';', 1)[0]
         if '/' in content_type:
@@ -65,38 +84,97 @@ class ComicImage(object):
         self.contentLength = int(self.urlobj.headers.get('content-length', 0))
         out.debug('... filename = %r, ext = %r, contentLength = %d' % (self.filename, self.ext, self.contentLength))
 
-    def save(self, basepath):
-        """Save comic URL to filename on disk."""
+    def getExistingFile(self, comicDir):
+        """Find an already saved file of this image with the file extension
+        of the image name. If the name has no common image file extension,
+        the file is saved with the extension of its MIME type, so the
+        extensions of common image types are tried as well. Empty files
+        are ignored.
+        @return: the filename or None if not found
+        """
+        exts = [self.ext] if self.ext else []
+        if self.ext.lower() not in self.ImageExtensions:
+            exts.extend(self.ImageExtensions)
+        for ext in exts:
+            fn = os.path.join(comicDir, "%s%s" % (self.filename, ext))
+            if os.path.isfile(fn) and os.path.getsize(fn) > 0:
+                return fn
+        return None
+
+    def save(self, basepath, syncer=None):
+        """Save comic URL to filename on disk. The file is flushed to disk
+        by the given syncer, default is to synchronize each file."""
+        if syncer is None:
+            syncer = Syncer()
+        comicDir = os.path.join(basepath, self.dirname)
+        fn = self.getExistingFile(comicDir)
+        if fn is not None:
+            # avoid connecting to the image URL
+            out.info('Skipping existing file "%s".' % fn)
+            return fn, False
         out.info("Get image URL %s" % self.url, level=1)
         self.connect()
         filename = "%s%s" % (self.filename, self.ext)
-        comicDir = os.path.join(basepath, self.dirname)
         if not os.path.isdir(comicDir):
-            os.makedirs(comicDir)
+            try:
+                os.makedirs(comicDir)
+            except OSError:
+                # another thread could have created the directory
+                if not os.path.isdir(comicDir):
+                    self.urlobj.close()
+                    raise
         fn = os.path.join(comicDir, filename)
         # compare with >= since content length could be the compressed size
         if os.path.isfile(fn) and os.path.getsize(fn) >= self.contentLength:
+            self.urlobj.close()
             out.info('Skipping existing file "%s".' % fn)
             return fn, False
-        content = self.urlobj.content
-        if not content:
-            out.warn("Empty content from %s, try again..." % self.url)
+        out.debug('Writing comic to file %s...' % fn)
+        size = self.download(fn, syncer)
+        tries = 0
+        while size == 0 and tries < MaxRetries:
+            pause = getRetryPause(tries)
+            out.warn("Empty content from %s, try again in %.1f seconds..." % (self.url, pause))
+            time.sleep(pause)
             self.connect()
-            content = self.urlobj.content
+            size = self.download(fn, syncer)
+            tries += 1
+        if size == 0:
+            raise OSError("empty file %s" % fn)
+        out.info("Saved %s (%s)." % (fn, strsize(size)))
+        getHandler().comicDownloaded(self, fn)
+        return fn, True
+
+    def download(self, fn, syncer):
+        """Stream the image content in chunks to a temporary file and rename
+        it to the given filename. The maximum image size is checked while
+        downloading. Empty content is not saved.
+        @return: number of downloaded bytes
+        @rtype: int
+        """
+        size = 0
+        sha1 = hashlib.sha1()
+        dirname, basename = os.path.split(fn)
+        fd, tmpname = make_tempfile(dirname, '.' + basename, '.part')
         try:
-            out.debug('Writing comic to file %s...' % fn)
-            with open(fn, 'wb') as comicOut:
-                comicOut.write(content)
-                comicOut.flush()
-                os.fsync(comicOut.fileno())
-            size = os.path.getsize(fn)
-            if size == 0:
-                raise OSError("empty file %s" % fn)
+            with os.fdopen(fd, 'wb') as comicOut:
+                for chunk in self.urlobj.iter_content(self.ChunkBytes):
+                    size += len(chunk)
+                    if size > MaxImageBytes:
+                        raise IOError('image content of %s exceeds %d bytes' % (self.url, MaxImageBytes))
+                    sha1.update(chunk)
+                    comicOut.write(chunk)
+                syncer.sync(comicOut)
+            if size:
+                rename(tmpname, fn)
+                syncer.add(fn)
+                self.sha1 = sha1.hexdigest()
+            else:
+                os.remove(tmpname)
         except Exception:
-            if os.path.isfile(fn):
-                os.remove(fn)
+            if os.path.isfile(tmpname):
+                os.remove(tmpname)
             raise
-        else:
-            out.info("Saved %s (%s)." % (fn, strsize(size)))
-            getHandler().comicDownloaded(self, fn)
-        return fn, True
+        finally:
+            self.urlobj.close()
+        return size
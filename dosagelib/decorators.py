@@ -1,5 +1,7 @@
 # -*- coding: iso-8859-1 -*-
 # Copyright (C) 2012-2013 Bastian Kleineidam
+import threading
+from collections import OrderedDict
 
 class memoized (object):
     """Decorator that caches a function's return value each time it is called.
@@ -28,3 +30,47 @@ class memoized (object):
         """Return the function's docstring."""
         return self.func.__doc__
 
+
+
+class lrucache (memoized):
+    """Decorator that caches the return values of the maxsize most recently
+    used arguments. It can be used by multiple threads."""
+
+    def __init__(self, func, maxsize):
+        """Store function and initialize the cache."""
+        super(lrucache, self).__init__(func)
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        """Lookup and return cached result if found and mark it as most
+        recently used. Else call stored function with given arguments and
+        remove the least recently used result if the cache is full."""
+        if kwargs:
+            return self.func(*args, **kwargs)
+        try:
+            with self.lock:
+                value = self.cache.pop(args)
+                self.cache[args] = value
+            return value
+        except KeyError:
+            pass
+        except TypeError:
+            # uncachable
+            return self.func(*args)
+        value = self.func(*args)
+        with self.lock:
+            self.cache[args] = value
+            if len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+        return value
+
+
+def lru_memoized(maxsize):
+    """Get a decorator that caches the return values of the maxsize most
+    recently used arguments, see lrucache."""
+    def decorator(func):
+        """Wrap the function with an LRU cache."""
+        return lrucache(func, maxsize)
+    return decorator
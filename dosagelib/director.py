@@ -0,0 +1,237 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+"""
+Run comic jobs in parallel threads.
+"""
+import threading
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+from .output import out
+
+# Seconds to wait for worker threads before checking for interrupts again
+JoinTimeoutSecs = 0.5
+
+
+class ComicQueue(Queue):
+    """The comic scraper job queue."""
+
+    def clear(self):
+        """Remove all queue entries."""
+        with self.mutex:
+            self.queue.clear()
+
+
+class ComicGetter(threading.Thread):
+    """Get comic strips from the job queue."""
+
+    def __init__(self, jobs, func):
+        """Store job queue and the function to call for each scraper."""
+        super(ComicGetter, self).__init__()
+        self.jobs = jobs
+        self.func = func
+        self.errors = 0
+        # do not block the program exit on Ctrl-C
+        self.daemon = True
+
+    def run(self):
+        """Process scrapers from the queue until it is empty."""
+        while True:
+            try:
+                scraperobj = self.jobs.get(False)
+            except Empty:
+                break
+            try:
+                self.errors += self.func(scraperobj)
+            except Exception as msg:
+                out.exception(msg)
+                self.errors += 1
+            finally:
+                self.jobs.task_done()
+
+
+class WorkerPool(object):
+    """Threads calling queued jobs. One pool can be shared by the strip
+    savers of all comics, so the number of threads does not grow with the
+    number of comics downloaded in parallel."""
+
+    def __init__(self, numthreads):
+        """Start numthreads worker threads."""
+        self.jobs = Queue()
+        self.threads = [threading.Thread(target=self.work) for dummy in range(numthreads)]
+        for thread in self.threads:
+            thread.daemon = True
+            thread.start()
+
+    def work(self):
+        """Call jobs from the queue until a None entry is found."""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            job()
+
+    def submit(self, job):
+        """Add a job without arguments to be called by a worker thread."""
+        self.jobs.put(job)
+
+    def close(self):
+        """Wait until all jobs are done and stop the threads."""
+        for thread in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            while thread.is_alive():
+                thread.join(JoinTimeoutSecs)
+
+
+class StripSaver(object):
+    """Save comic strips in background threads while the caller continues
+    to traverse the comic pages. The number of strips waiting to be saved
+    is bounded, so page traversal stays at most a few strips ahead."""
+
+    def __init__(self, func, numthreads, context=u'', pool=None):
+        """Call func for each strip with numthreads threads of the given
+        worker pool, or of an own pool if no pool is given.
+        The function must return a tuple (errors, skipped)."""
+        self.func = func
+        self.context = context
+        self.maxpending = numthreads * 2
+        self.numpending = 0
+        self.cond = threading.Condition()
+        self.results = Queue()
+        self.ownpool = pool is None
+        if self.ownpool:
+            pool = WorkerPool(numthreads)
+        self.pool = pool
+
+    def save(self, strip):
+        """Save one strip and store the result."""
+        out.context = self.context
+        try:
+            result = self.func(strip)
+        except Exception as msg:
+            out.exception(msg)
+            result = (1, False)
+        self.results.put(result)
+        with self.cond:
+            self.numpending -= 1
+            self.cond.notify_all()
+
+    def put(self, strip):
+        """Add a strip to be saved. Blocks while too many strips are
+        waiting."""
+        with self.cond:
+            while self.numpending >= self.maxpending:
+                self.cond.wait(JoinTimeoutSecs)
+            self.numpending += 1
+        self.pool.submit(lambda: self.save(strip))
+
+    def getResults(self):
+        """Return the results of all strips saved so far.
+        @return: list of (errors, skipped) tuples
+        @rtype: list of tuple
+        """
+        results = []
+        while True:
+            try:
+                results.append(self.results.get(False))
+            except Empty:
+                break
+        return results
+
+    def close(self):
+        """Wait until all strips are saved and stop the threads of an
+        own worker pool.
+        @return: list of (errors, skipped) tuples of the remaining strips
+        @rtype: list of tuple
+        """
+        with self.cond:
+            while self.numpending:
+                self.cond.wait(JoinTimeoutSecs)
+        if self.ownpool:
+            self.pool.close()
+        return self.getResults()
+
+
+def imap(func, items, numthreads, lookahead=None):
+    """Yield func(item) for each item in the order of items, with func
+    being called by numthreads parallel threads. At most lookahead
+    results (default is twice the number of threads) are computed ahead
+    of the consumer. Exceptions of func are raised when their result
+    would be yielded.
+    """
+    items = list(items)
+    if lookahead is None:
+        lookahead = numthreads * 2
+    context = out.context
+    jobs = ComicQueue()
+    for i in range(len(items)):
+        jobs.put(i)
+    window = threading.Semaphore(lookahead)
+    results = {}
+    cond = threading.Condition()
+
+    def work():
+        """Call func for queued items until the queue is empty."""
+        out.context = context
+        while True:
+            window.acquire()
+            try:
+                i = jobs.get(False)
+            except Empty:
+                window.release()
+                break
+            try:
+                result = (True, func(items[i]))
+            except Exception as msg:
+                result = (False, msg)
+            with cond:
+                results[i] = result
+                cond.notify_all()
+
+    threads = [threading.Thread(target=work) for dummy in range(min(numthreads, len(items)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    try:
+        for i in range(len(items)):
+            with cond:
+                while i not in results:
+                    cond.wait(JoinTimeoutSecs)
+                ok, value = results.pop(i)
+            window.release()
+            if not ok:
+                raise value
+            yield value
+    finally:
+        # stop the threads when the consumer stops early
+        jobs.clear()
+        for thread in threads:
+            window.release()
+
+
+def run(func, scrapers, numjobs=1):
+    """Call func for each scraper object. With more than one job the
+    scrapers are processed by numjobs parallel threads. The function
+    must return the number of errors.
+    @return: number of errors
+    @rtype: int
+    """
+    if numjobs <= 1:
+        return sum(func(scraperobj) for scraperobj in scrapers)
+    jobs = ComicQueue()
+    for scraperobj in scrapers:
+        jobs.put(scraperobj)
+    numjobs = min(numjobs, jobs.qsize())
+    threads = [ComicGetter(jobs, func) for dummy in range(numjobs)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(JoinTimeoutSecs)
+    except KeyboardInterrupt:
+        jobs.clear()
+        raise
+    return sum(thread.errors for thread in threads)
@@ -2,12 +2,14 @@
 # Copyright (C) 2004-2005 Tristan Seligmann and Jonathan Jacobs
 import os
 import time
+import threading
 try:
     from urllib.parse import quote as url_quote
 except ImportError:
     from urllib import quote as url_quote
 import codecs
 import json
+from collections import OrderedDict
 from . import rss, util, configuration
 
 class EventHandler(object):
@@ -148,38 +150,31 @@ class HtmlEventHandler(EventHandler):
 <ul>
 ''' % (self.encoding, configuration.App, time.strftime('%Y/%m/%d', today),
        yesterdayUrl, tomorrowUrl))
-        # last comic name (eg. CalvinAndHobbes)
-        self.lastComic = None
-        # last comic strip URL (eg. http://example.com/page42)
-        self.lastUrl = None
+        # image URLs by page URL by comic name, written in end() so that
+        # comics downloaded in parallel are not mixed
+        self.comics = OrderedDict()
 
     def comicDownloaded(self, comic, filename):
-        """Write HTML entry for downloaded comic."""
-        if self.lastComic != comic.name:
-            self.newComic(comic)
+        """Store HTML entry for downloaded comic."""
         imageUrl = self.getUrlFromFilename(filename)
-        pageUrl = comic.referrer
-        if pageUrl != self.lastUrl:
-            self.html.write(u'<li><a href="%s">%s</a>\n' % (pageUrl, pageUrl))
-        self.html.write(u'<br/><img src="%s"/>\n' % imageUrl)
-        self.lastComic = comic.name
-        self.lastUrl = pageUrl
+        pages = self.comics.setdefault(comic.name, OrderedDict())
+        pages.setdefault(comic.referrer, []).append(imageUrl)
 
-    def newComic(self, comic):
-        """Start new comic list in HTML."""
-        if self.lastUrl is not None:
-            self.html.write(u'</li>\n')
-        if self.lastComic is not None:
-            self.html.write(u'</ul>\n')
-        self.html.write(u'<li>%s</li>\n' % comic.name)
+    def writeComic(self, name, pages):
+        """Write the HTML list of the downloaded pages of one comic."""
+        self.html.write(u'<li>%s</li>\n' % name)
         self.html.write(u'<ul>\n')
+        for pageUrl, imageUrls in pages.items():
+            self.html.write(u'<li><a href="%s">%s</a>\n' % (pageUrl, pageUrl))
+            for imageUrl in imageUrls:
+                self.html.write(u'<br/><img src="%s"/>\n' % imageUrl)
+            self.html.write(u'</li>\n')
+        self.html.write(u'</ul>\n')
 
     def end(self):
-        """End HTML output."""
-        if self.lastUrl is not None:
-            self.html.write(u'</li>\n')
-        if self.lastComic is not None:
-            self.html.write(u'</ul>\n')
+        """Write the downloaded comics and end HTML output."""
+        for name, pages in self.comics.items():
+            self.writeComic(name, pages)
         self.html.write(u'''</ul>
 </body>
 </html>''')
@@ -263,6 +258,9 @@ def addHandler(name, basepath=None, baseurl=None):
     _handlers.append(_handler_classes[name](basepath, baseurl))
 
 
+# serialize events from parallel download threads
+lock = threading.Lock()
+
 class MultiHandler(object):
     """Encapsulate a list of handlers."""
 
@@ -273,13 +271,15 @@ class MultiHandler(object):
 
     def comicDownloaded(self, comic, filename):
         """Emit comic downloaded events for handlers."""
-        for handler in _handlers:
-            handler.comicDownloaded(comic, filename)
+        with lock:
+            for handler in _handlers:
+                handler.comicDownloaded(comic, filename)
 
     def comicPageLink(self, comic, url, prevUrl):
         """Emit an event to inform the handler about links between comic pages. Should be overridden in subclass."""
-        for handler in _handlers:
-            handler.comicPageLink(comic, url, prevUrl)
+        with lock:
+            for handler in _handlers:
+                handler.comicPageLink(comic, url, prevUrl)
 
     def end(self):
         """Emit end events for handlers."""
@@ -3,6 +3,10 @@
 """
 File and path utilities.
 """
+import os
+import uuid
+import errno
+import threading
 import importlib
 
 def has_module (name):
@@ -21,3 +25,138 @@ def has_module (name):
 def is_tty (fp):
     """Check if a file object is a TTY."""
     return (hasattr(fp, "isatty") and fp.isatty())
+
+
+def get_subdirs(path):
+    """Get the names of all subdirectories of the given directory, or an
+    empty list if it could not be read. The directory types are taken
+    from the directory listing where os.scandir() is available.
+    @return: subdirectory names
+    @rtype: list of string
+    """
+    try:
+        if hasattr(os, 'scandir'):
+            return [entry.name for entry in os.scandir(path) if entry.is_dir()]
+        return [name for name in os.listdir(path)
+                if os.path.isdir(os.path.join(path, name))]
+    except OSError:
+        return []
+
+
+# Number of tries to find an unused temporary filename
+TempfileTries = 100
+
+def make_tempfile(dirname, prefix, suffix):
+    """Create a new file with a random name for writing, like
+    tempfile.mkstemp(). Unlike mkstemp() the file permissions are those
+    of files created with open(), ie. 0666 without the bits of the umask,
+    so that the file can be renamed to its final name.
+    @return: tuple (file descriptor, filename)
+    @rtype: tuple
+    """
+    flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0)
+    for dummy in range(TempfileTries):
+        name = os.path.join(dirname, prefix + uuid.uuid4().hex[:12] + suffix)
+        try:
+            return os.open(name, flags, 0o666), name
+        except OSError as err:
+            if err.errno != errno.EEXIST:
+                raise
+    raise IOError(errno.EEXIST, "No usable temporary filename found in %s" % dirname)
+
+
+def write_file(filename, data):
+    """Write data to a file atomically by writing a temporary file in the
+    same directory and renaming it."""
+    dirname, basename = os.path.split(filename)
+    fd, tmpname = make_tempfile(dirname, basename, '.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        rename(tmpname, filename)
+    except Exception:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+        raise
+
+
+def rename(src, dst):
+    """Rename src to dst, replacing an existing dst file."""
+    if os.name == 'nt' and os.path.exists(dst):
+        # Windows does not replace existing files on rename
+        os.remove(dst)
+    os.rename(src, dst)
+
+
+# Modes of writing files to disk, see Syncer
+SyncModes = ('always', 'batch', 'never')
+
+
+class Syncer(object):
+    """Flush written files to disk according to a synchronization mode:
+    always - each file is synchronized before it is renamed
+    batch - files are synchronized together when flush() is called
+      or every batchfiles files
+    never - synchronization is left to the operating system
+    """
+
+    def __init__(self, mode='always', batchfiles=0):
+        """Set the synchronization mode."""
+        if mode not in SyncModes:
+            raise ValueError("invalid sync mode %r" % mode)
+        self.mode = mode
+        self.batchfiles = batchfiles
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def sync(self, fileobj):
+        """Synchronize an open file after its data has been written."""
+        fileobj.flush()
+        if self.mode == 'always':
+            os.fsync(fileobj.fileno())
+
+    def add(self, filename):
+        """Register a completely written and renamed file."""
+        if self.mode != 'batch':
+            return
+        with self.lock:
+            self.pending.append(filename)
+            if not self.batchfiles or len(self.pending) < self.batchfiles:
+                return
+            filenames, self.pending = self.pending, []
+        sync_files(filenames)
+
+    def flush(self):
+        """Synchronize all pending files."""
+        with self.lock:
+            filenames, self.pending = self.pending, []
+        sync_files(filenames)
+
+
+def sync_files(filenames):
+    """Flush the given files and their directories to disk."""
+    # files must be writable on Windows for fsync()
+    flags = os.O_RDWR if os.name == 'nt' else os.O_RDONLY
+    dirnames = set()
+    for filename in filenames:
+        try:
+            fsync_path(filename, flags)
+        except OSError:
+            pass
+        dirnames.add(os.path.dirname(filename))
+    if os.name != 'nt':
+        # directories can not be opened on Windows
+        for dirname in dirnames:
+            try:
+                fsync_path(dirname, os.O_RDONLY)
+            except OSError:
+                pass
+
+
+def fsync_path(path, flags):
+    """Flush the given file or directory to disk."""
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -25,6 +25,12 @@ def regexNamer(regex, usePageUrl=False):
     return _namer
 
 
+def languageFromName(name):
+    """Get language of a comic whose name ends with "Spanish" for Spanish
+    comics."""
+    return 'es' if name.lower().endswith('spanish') else 'en'
+
+
 def bounceStarter(url, nextSearch):
     """Get start URL by "bouncing" back and forth one time."""
     @classmethod
@@ -7,6 +7,7 @@ import os
 import sys
 import zipfile
 import importlib
+import threading
 from .output import out
 
 
@@ -64,7 +65,8 @@ def get_plugins(modules, classobj):
 
 
 def get_module_plugins(module, classobj):
-    """Return all subclasses of _BasicScraper in the module.
+    """Return all subclasses of _BasicScraper in the module, including
+    lazy plugins of such classes.
     If the module defines __all__, only those entries will be searched,
     otherwise all objects not starting with '_' will be searched.
     """
@@ -77,8 +79,71 @@ def get_module_plugins(module, classobj):
             obj = getattr(module, name)
         except AttributeError:
             continue
+        if isinstance(obj, LazyPlugin):
+            if issubclass(obj.baseclass, classobj):
+                yield obj
+            continue
         try:
             if issubclass(obj, classobj):
                 yield obj
         except TypeError:
             continue
+
+
+_lazylock = threading.Lock()
+
+class LazyPlugin(object):
+    """Placeholder for a generated plugin class, which is created by
+    calling factory(*args) when an attribute is accessed that is not
+    stored in the placeholder. Calling the placeholder creates an
+    instance of the plugin class."""
+
+    __slots__ = ('classname', 'factory', 'args', 'plugin')
+
+    # base class of the created plugin classes
+    baseclass = object
+
+    def __init__(self, classname, factory, args):
+        """Store the class name and the arguments to create the class."""
+        self.classname = classname
+        self.factory = factory
+        self.args = args
+        self.plugin = None
+
+    @property
+    def __name__(self):
+        """The class name of the plugin."""
+        return self.classname
+
+    def load(self):
+        """Create the plugin class if needed.
+        @return: the plugin class
+        @rtype: class
+        """
+        if self.plugin is None:
+            with _lazylock:
+                if self.plugin is None:
+                    self.plugin = self.create()
+        return self.plugin
+
+    def create(self):
+        """Create the plugin class with factory(*args).
+        @return: the plugin class
+        @rtype: class
+        """
+        return self.factory(*self.args)
+
+    def __getattr__(self, name):
+        """Get attributes not stored in the placeholder from the plugin
+        class."""
+        if name.startswith('__') or name in LazyPlugin.__slots__:
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __call__(self, *args, **kwargs):
+        """Create an instance of the plugin class."""
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        """Show the class name."""
+        return "<lazy plugin %s>" % self.classname
@@ -0,0 +1,64 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+"""
+Index of comic scraper names for fast lookups.
+"""
+
+
+def getTrigrams(name):
+    """Get the set of all three character substrings of a name."""
+    return set(name[i:i+3] for i in range(len(name) - 2))
+
+
+class NameIndex(object):
+    """Find scrapers by case insensitive exact or substring match of
+    their names. The scrapers can be any objects with a getName() method.
+    Substring searches use an index of all three character substrings
+    of the lowercase names."""
+
+    def __init__(self, scrapers):
+        """Build the name index for the given scrapers."""
+        self.scrapers = list(scrapers)
+        self.lnames = [scraper.getName().lower() for scraper in self.scrapers]
+        self.exact = {}
+        self.trigrams = {}
+        for pos, lname in enumerate(self.lnames):
+            self.exact.setdefault(lname, pos)
+            for trigram in getTrigrams(lname):
+                self.trigrams.setdefault(trigram, []).append(pos)
+
+    def getSubstringPositions(self, lname):
+        """Get the sorted positions of all names containing the given
+        lowercase name."""
+        if len(lname) < 3:
+            candidates = range(len(self.lnames))
+        else:
+            postings = []
+            for trigram in getTrigrams(lname):
+                if trigram not in self.trigrams:
+                    return []
+                postings.append(self.trigrams[trigram])
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for positions in postings[1:]:
+                candidates.intersection_update(positions)
+                if not candidates:
+                    return []
+            candidates = sorted(candidates)
+        return [pos for pos in candidates if lname in self.lnames[pos]]
+
+    def find(self, comic, multiple_allowed=False):
+        """Get a list of scrapers matching the given comic name. An exact
+        match is returned alone unless multiple_allowed is True, else
+        it raises a ValueError if multiple scrapers match."""
+        cname = comic.lower()
+        if not multiple_allowed and cname in self.exact:
+            # perfect match
+            return [self.scrapers[self.exact[cname]]]
+        candidates = [self.scrapers[pos] for pos in self.getSubstringPositions(cname)]
+        if len(candidates) > 1 and not multiple_allowed:
+            comics = ", ".join(x.getName() for x in candidates)
+            raise ValueError('multiple comics found: %s' % comics)
+        elif not candidates:
+            raise ValueError('comic %r not found' % comic)
+        return candidates
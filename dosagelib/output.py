@@ -15,11 +15,24 @@ class Output(object):
 
     def __init__(self, stream=sys.stdout):
         """Initialize context and indentation."""
+        # the context is stored per thread so that comics downloaded in
+        # parallel keep their own output prefix
+        self.local = threading.local()
         self.context = u''
         self.level = 0
         self.timestamps = False
         self.setStream(stream)
 
+    def _get_context(self):
+        """Get output context of the current thread."""
+        return getattr(self.local, 'context', u'')
+
+    def _set_context(self, context):
+        """Set output context of the current thread."""
+        self.local.context = context
+
+    context = property(_get_context, _set_context)
+
     def setStream(self, stream):
         """Initialize context and indentation."""
         self.stream = Colorizer(stream)
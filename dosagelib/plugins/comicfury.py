@@ -4,7 +4,7 @@
 Comicfury comic strips
 """
 from re import compile
-from ..scraper import make_scraper
+from ..scraper import make_scraper, LazyScraper
 from ..util import tagre
 from ..helpers import bounceStarter
 
@@ -15,16 +15,22 @@ _nextSearch = compile(tagre("a", "href", r'(/comics/\d+)', after='next'))
 
 def add(name, url, description):
     classname = 'ComicFury_%s' % name
+    globals()[classname] = LazyScraper(classname, _make_scraper,
+        (classname, name),
+        name = 'ComicFury/' + name,
+        url = url,
+        description = description,
+    )
 
+
+def _make_scraper(classname, comicname, url, **metadata):
     @classmethod
     def namer(cls, imageUrl, pageUrl):
         parts = pageUrl.split('/')
         num = parts[-1]
-        return "%s_%s" % (name, num)
+        return "%s_%s" % (comicname, num)
 
-    globals()[classname] = make_scraper(classname,
-        name='ComicFury/' + name,
-        description = description,
+    return make_scraper(classname,
         url = url,
         stripUrl = url + '%s',
         starter = bounceStarter(url, _nextSearch),
@@ -32,6 +38,7 @@ def add(name, url, description):
         prevSearch = _prevSearch,
         help = 'Index format: none',
         namer = namer,
+        **metadata
     )
 
 # do not edit anything below since these entries are generated from scripts/update.sh
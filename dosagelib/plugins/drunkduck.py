@@ -3,8 +3,9 @@
 # Copyright (C) 2012-2013 Bastian Kleineidam
 
 from re import compile
-from ..scraper import make_scraper
+from ..scraper import make_scraper, LazyScraper
 from ..util import tagre, fetchUrl, getPageContent
+from ..helpers import languageFromName
 
 # note: adding the compile() functions inside add() is a major performance hog
 _imageSearch =  compile(tagre("img", "src", r'(http://media\.drunkduck\.com\.s3\.amazonaws\.com:80/[^"]+)', before="page-image"))
@@ -15,7 +16,16 @@ _lastSearch = compile(_linkSearch + tagre("img", "class", "arrow_last"))
 
 def add(name, path):
     classname = 'DrunkDuck_%s' % name
-    _url = 'http://www.drunkduck.com/%s/' % path
+    globals()[classname] = LazyScraper(classname, _make_scraper,
+        (classname,),
+        name = 'DrunkDuck/' + name,
+        url = 'http://www.drunkduck.com/%s/' % path,
+        lang = languageFromName(name),
+    )
+
+
+def _make_scraper(classname, url, **metadata):
+    _url = url
 
     @classmethod
     def _namer(cls, imageUrl, pageUrl):
@@ -36,16 +46,15 @@ def add(name, path):
             data, baseUrl = getPageContent(url, cls.session)
             return fetchUrl(url, data, baseUrl, _nextSearch)
 
-    globals()[classname] = make_scraper(classname,
-        name = 'DrunkDuck/' + name,
+    return make_scraper(classname,
         url = _url,
         starter = _starter,
         stripUrl = _url + '%s/',
         imageSearch = _imageSearch,
         prevSearch = _prevSearch,
-        lang = 'es' if name.lower().endswith('spanish') else 'en',
         help = 'Index format: n (unpadded)',
         namer = _namer,
+        **metadata
     )
 
 # do not edit anything below since these entries are generated from scripts/update.sh
@@ -3,7 +3,7 @@
 # Copyright (C) 2012-2013 Bastian Kleineidam
 
 from re import compile
-from ..scraper import make_scraper
+from ..scraper import make_scraper, LazyScraper
 from ..util import tagre
 from ..helpers import bounceStarter
 
@@ -14,25 +14,33 @@ _imageSearch = (
 _prevSearch = compile(tagre("a", "href", r'(/[^"]+/\d+/\d+/\d+)', after="prev"))
 _nextSearch = compile(tagre("a", "href", r'(/[^"]+/\d+/\d+/\d+)', after="next"))
 
+_baseUrl = 'http://www.gocomics.com'
+
 def add(name, shortname):
-    baseUrl = 'http://www.gocomics.com'
-    url = baseUrl + shortname
     classname = 'GoComics_%s' % name
+    globals()[classname] = LazyScraper(classname, _make_scraper,
+        (classname, name),
+        name='GoComics/' + name,
+        url=_baseUrl + shortname,
+    )
+
+
+def _make_scraper(classname, comicname, url, **metadata):
 
     @classmethod
     def namer(cls, imageUrl, pageUrl):
         prefix, year, month, day = pageUrl.rsplit('/', 3)
-        return "%s_%s%s%s.gif" % (name, year, month, day)
+        return "%s_%s%s%s.gif" % (comicname, year, month, day)
 
-    globals()[classname] = make_scraper(classname,
+    return make_scraper(classname,
         url = url,
         starter = bounceStarter(url, _nextSearch),
-        name='GoComics/' + name,
-        stripUrl=baseUrl + shortname + '/%s',
+        stripUrl=url + '/%s',
         imageSearch = _imageSearch,
         prevSearch = _prevSearch,
         help='Index format: yyyy/mm/dd',
         namer=namer,
+        **metadata
     )
 
 
@@ -2,8 +2,9 @@
 # Copyright (C) 2004-2005 Tristan Seligmann and Jonathan Jacobs
 # Copyright (C) 2012-2013 Bastian Kleineidam
 from re import compile
-from ..scraper import make_scraper
+from ..scraper import make_scraper, LazyScraper
 from ..util import tagre, quote, fetchUrl, case_insensitive_re, getPageContent
+from ..helpers import languageFromName
 
 # SmackJeeves is a crawlers nightmare - users are allowed to edit HTML directly.
 # That's why there are so much different search patterns.
@@ -33,7 +34,17 @@ _nextSearch = (
 
 def add(name, url, description, adult, bounce):
     classname = 'SmackJeeves_' + name
+    globals()[classname] = LazyScraper(classname, _make_scraper,
+        (classname, bounce),
+        name = 'SmackJeeves/' + name,
+        url = url,
+        adult = adult,
+        lang = languageFromName(name),
+        description = description,
+    )
+
 
+def _make_scraper(classname, bounce, url, adult, **metadata):
     def modifier(pageUrl):
         if adult:
             # mature content can be viewed directly with:
@@ -60,8 +71,7 @@ def add(name, url, description, adult, bounce):
         num = parts[-3]
         return "%s_%s" % (name, num)
 
-    globals()[classname] = make_scraper(classname,
-        name = 'SmackJeeves/' + name,
+    return make_scraper(classname,
         adult = adult,
         url = url,
         starter = _starter,
@@ -70,10 +80,9 @@ def add(name, url, description, adult, bounce):
         imageSearch = _imageSearch,
         prevSearch = _prevSearch,
         prevUrlMatchesStripUrl = not adult,
-        description = description,
-        lang = 'es' if name.lower().endswith('spanish') else 'en',
         help = 'Index format: nnnn (some increasing number)',
         namer = namer,
+        **metadata
     )
 
 
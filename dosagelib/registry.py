@@ -0,0 +1,198 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+"""
+Index of all comic scrapers, so that single comics can be found without
+importing all plugin modules.
+"""
+import os
+import sys
+import json
+import importlib
+from . import loader, configuration
+from .output import out
+from .fileutil import write_file
+from .nameindex import NameIndex
+
+# Increase when the format of the registry file changes
+RegistryVersion = 1
+
+
+class RegistryEntry(object):
+    """Metadata of one comic scraper class."""
+
+    __slots__ = ('name', 'module', 'classname', 'adult', 'lang', 'url')
+
+    def __init__(self, name, module, classname, adult, lang, url):
+        """Store the scraper metadata."""
+        self.name = name
+        self.module = module
+        self.classname = classname
+        self.adult = adult
+        self.lang = lang
+        self.url = url
+
+    def getName(self):
+        """Get scraper name."""
+        return self.name
+
+    def toList(self):
+        """Get the metadata as JSON serializable list."""
+        return [getattr(self, attr) for attr in self.__slots__]
+
+    @classmethod
+    def fromScraperclass(cls, modname, scraperclass):
+        """Get metadata of a scraper class defined in the given module.
+        Generated scraper classes do not have the name of their defining
+        module in their __module__ attribute."""
+        return cls(scraperclass.getName(), modname, scraperclass.__name__,
+          bool(scraperclass.adult), scraperclass.lang, scraperclass.url)
+
+    def load(self):
+        """Import the module of this entry and get the scraper class.
+        @return: the scraper class or None if it is not defined in the module
+        @rtype: class or None
+        """
+        try:
+            module = importlib.import_module(self.module)
+        except ImportError as msg:
+            out.debug("could not import %s: %s" % (self.module, msg))
+            return None
+        scraperclass = getattr(module, self.classname, None)
+        if scraperclass is None or scraperclass.getName() != self.name:
+            return None
+        return scraperclass
+
+
+def getSignature(folder='plugins'):
+    """Get a value that changes when the plugin modules change.
+    @return: list of [name, size, modification time] entries
+    @rtype: list
+    """
+    if loader.is_frozen():
+        # plugins are stored in the library.zip file
+        zipname = os.path.dirname(os.path.dirname(__file__))
+        names = [(zipname, zipname)]
+    else:
+        dirname = os.path.join(os.path.dirname(__file__), folder)
+        names = [(modname, os.path.join(dirname, modname + '.py'))
+          for modname in sorted(loader.get_importable_modules(dirname))]
+    signature = []
+    for name, filename in names:
+        stat = os.stat(filename)
+        signature.append([name, stat.st_size, int(stat.st_mtime)])
+    return signature
+
+
+class Registry(object):
+    """A registry file with the metadata of all scraper classes. The file
+    is only valid for the program version and plugin modules it was
+    generated from."""
+
+    def __init__(self, filename):
+        """Set registry filename."""
+        self.filename = filename
+        self.signature = None
+        # entries of the registry file, loaded on first use
+        self.entries = None
+        self.loaded = False
+        self.nameindex = None
+
+    def getSignature(self):
+        """Get the signature of the installed plugin modules."""
+        if self.signature is None:
+            self.signature = [RegistryVersion, configuration.Version,
+              sys.version_info[0], getSignature()]
+        return self.signature
+
+    def load(self):
+        """Get the registry entries if the registry file is up to date.
+        The result is cached.
+        @return: list of entries or None if the file is missing or stale
+        @rtype: list of RegistryEntry or None
+        """
+        if not self.loaded:
+            self.entries = self.read()
+            self.loaded = True
+        return self.entries
+
+    def getNameIndex(self):
+        """Get the name index of the registry entries.
+        @return: name index or None if the file is missing or stale
+        @rtype: NameIndex or None
+        """
+        if self.nameindex is None:
+            entries = self.load()
+            if entries is None:
+                return None
+            self.nameindex = NameIndex(entries)
+        return self.nameindex
+
+    def invalidate(self):
+        """Mark the registry as out of date, so that it will be written
+        again after all plugin modules have been loaded."""
+        self.entries = None
+        self.loaded = True
+        self.nameindex = None
+
+    def read(self):
+        """Read the registry entries if the registry file is up to date.
+        @return: list of entries or None if the file is missing or stale
+        @rtype: list of RegistryEntry or None
+        """
+        try:
+            with open(self.filename, 'rb') as f:
+                data = json.loads(f.read().decode('utf-8'))
+            if data.get('signature') != self.getSignature():
+                out.debug("Comic registry %s is out of date" % self.filename)
+                return None
+            return [RegistryEntry(*entry) for entry in data['scrapers']]
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, plugins):
+        """Write the metadata of the given scraper classes to the
+        registry file.
+        @param plugins: tuples (module name, scraper class)
+        @ptype plugins: list of tuple
+        """
+        data = dict(signature=self.getSignature(),
+          scrapers=[RegistryEntry.fromScraperclass(modname, scraperclass).toList()
+                    for modname, scraperclass in plugins])
+        try:
+            dirname = os.path.dirname(self.filename)
+            if dirname and not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            write_file(self.filename, json.dumps(data).encode('utf-8'))
+            out.debug("Wrote comic registry %s" % self.filename)
+            self.loaded = False
+            self.nameindex = None
+        except (IOError, OSError) as msg:
+            out.warn("Could not write comic registry %s: %s" % (self.filename, msg))
+
+
+def loadScraperclasses(entries):
+    """Get the scraper classes of the given registry entries.
+    @return: list of scraper classes or None if an entry is not valid
+    @rtype: list of class or None
+    """
+    scraperclasses = []
+    for entry in entries:
+        scraperclass = entry.load()
+        if scraperclass is None:
+            return None
+        scraperclasses.append(scraperclass)
+    return scraperclasses
+
+
+_registry = None
+
+def setRegistry(registry):
+    """Set the registry used to find scraper classes, or None to always
+    search all plugin modules."""
+    global _registry
+    _registry = registry
+
+
+def getRegistry():
+    """Get the registry or None if it is disabled."""
+    return _registry
@@ -1,83 +1,136 @@
 # -*- coding: iso-8859-1 -*-
 # Copyright (C) 2004-2005 Tristan Seligmann and Jonathan Jacobs
+# Copyright (C) 2012-2013 Bastian Kleineidam
 # TODO: Not sure if this RSS output is "valid", should be though.
 #       Might also be nice categorise Comics under one Item
 
-import xml.dom.minidom
 import time
+from collections import deque
+from io import BytesIO
+from xml.sax.saxutils import XMLGenerator
+try:
+    import xml.etree.cElementTree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
 from .configuration import App
 
+# Maximum number of items in a feed; older items are dropped
+MaxItems = 1000
+
+
 class Feed(object):
-    """Write an RSS feed with comic strip images."""
+    """Write an RSS feed with comic strip images. The items are stored
+    newest first in a bounded queue and written with a streaming XML
+    generator, so adding an item takes constant time."""
 
-    def __init__(self, title, link, description, lang='en-us', encoding="utf-8"):
+    def __init__(self, title, link, description, lang='en-us', encoding="utf-8",
+                 maxitems=MaxItems):
         """Initialize RSS writer with given title, link and description."""
         self.encoding = encoding
-        self.rss = xml.dom.minidom.Document()
-        root = self.rss.appendChild(self.rss.createElement('rss'))
-        root.setAttribute('version', '2.0')
-        self.channel = root.appendChild(self.rss.createElement('channel'))
-        self.addElement(self.channel, 'title', title)
-        self.addElement(self.channel, 'link', link)
-        self.addElement(self.channel, 'language', lang)
-        self.addElement(self.channel, 'description', description)
-        self.addElement(self.channel, 'generator', App)
-
-    def addElement(self, parent, tag, value):
-        """Add an RSS item."""
-        elem = self.rss.createElement(tag)
-        node = self.rss.createTextNode(value)
-        return parent.appendChild(elem).appendChild(node)
+        self.channel = (
+            ('title', title),
+            ('link', link),
+            ('language', lang),
+            ('description', description),
+            ('generator', App),
+        )
+        self.maxitems = maxitems
+        self.items = deque(maxlen=maxitems)
 
     def addItem(self, title, link, description, date, append=True):
-        """Insert an item."""
-        item = self.rss.createElement('item')
-
-        self.addElement(item, 'title', title)
-        self.addElement(item, 'link', link)
-        self.addElement(item, 'description', description)
-        self.addElement(item, 'guid', link)
-        self.addElement(item, 'pubDate', date)
-
+        """Insert an item. Appended items are older than all others and
+        are dropped if the feed is full, else the oldest item is dropped."""
+        item = (
+            ('title', title),
+            ('link', link),
+            ('description', description),
+            ('guid', link),
+            ('pubDate', date),
+        )
         if append:
-            self.channel.appendChild(item)
+            if len(self.items) < self.maxitems:
+                self.items.append(item)
         else:
-            elems = self.rss.getElementsByTagName('item')
-            if elems:
-                self.channel.insertBefore(item, elems[0])
-            else:
-                self.channel.appendChild(item)
+            self.items.appendleft(item)
 
     def write(self, path):
         """Write RSS content to file."""
         with open(path, 'wb') as f:
-            f.write(self.getXML())
+            self.writeXML(f)
 
     def getXML(self):
         """Get RSS content in XML format."""
-        return self.rss.toxml(self.encoding)
+        f = BytesIO()
+        self.writeXML(f)
+        return f.getvalue()
+
+    def writeXML(self, f):
+        """Write RSS content in XML format to a binary file object."""
+        gen = XMLGenerator(f, self.encoding)
+        gen.startDocument()
+        gen.startElement('rss', {'version': '2.0'})
+        gen.startElement('channel', {})
+        self.writeElements(gen, self.channel)
+        for item in self.items:
+            gen.startElement('item', {})
+            self.writeElements(gen, item)
+            gen.endElement('item')
+        gen.endElement('channel')
+        gen.endElement('rss')
+        gen.endDocument()
+
+    def writeElements(self, gen, elements):
+        """Write elements with text content."""
+        for tag, value in elements:
+            gen.startElement(tag, {})
+            gen.characters(value)
+            gen.endElement(tag)
+
+
+# Month numbers of the English month abbreviations in RSS dates
+Months = dict((name, num) for num, name in enumerate(('Jan', 'Feb', 'Mar',
+  'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1))
+
+
+def parseDate(date):
+    """Parse an RSS date like 'Tue, 01 Jan 2013 12:00:00 GMT'. Dates
+    with month names of other locales are parsed with time.strptime().
+    @return: year, month, day, hour, minute and second
+    @rtype: tuple of int
+    """
+    try:
+        day, month, year, clock = date.split()[1:5]
+        hour, minute, second = clock.split(':')
+        return (int(year), Months[month], int(day), int(hour), int(minute), int(second))
+    except (ValueError, KeyError):
+        return tuple(time.strptime(date, '%a, %d %b %Y %H:%M:%S GMT')[:6])
 
 
 def parseFeed(filename, yesterday):
-    """Parse an RSS feed and filter only entries that are newer than yesterday."""
-    dom = xml.dom.minidom.parse(filename)
-
-    getText = lambda node, tag: node.getElementsByTagName(tag)[0].childNodes[0].data
-    getNode = lambda tag: dom.getElementsByTagName(tag)
-
-    content = getNode('channel')[0] # Only one channel node
-
-    feedTitle = getText(content, 'title')
-    feedLink = getText(content, 'link')
-    feedDesc = getText(content, 'description')
-
-    feed = Feed(feedTitle, feedLink, feedDesc)
-
-    for item in getNode('item'):
-        itemDate = time.strptime(getText(item, 'pubDate'), '%a, %d %b %Y %H:%M:%S GMT')
-        if (itemDate > yesterday): # If newer than yesterday
-            feed.addItem(getText(item, 'title'),
-                         getText(item, 'link'),
-                         getText(item, 'description'),
-                         getText(item, 'pubDate'))
+    """Parse an RSS feed and filter only entries that are newer than yesterday.
+    The feed items are stored newest first, so parsing stops at the first
+    item that is not newer."""
+    since = tuple(yesterday[:6])
+    # items written in one run often have the same date
+    dates = {}
+    channel = {}
+    feed = None
+    with open(filename, 'rb') as f:
+        for event, elem in ElementTree.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == 'item' and feed is None:
+                    feed = Feed(channel['title'], channel['link'], channel['description'])
+            elif elem.tag == 'item':
+                date = elem.findtext('pubDate')
+                if date not in dates:
+                    dates[date] = parseDate(date)
+                if dates[date] <= since:
+                    break
+                feed.addItem(elem.findtext('title'), elem.findtext('link'),
+                             elem.findtext('description'), date)
+                elem.clear()
+            elif feed is None and elem.tag in ('title', 'link', 'description'):
+                channel[elem.tag] = elem.text or u''
+    if feed is None:
+        feed = Feed(channel['title'], channel['link'], channel['description'])
     return feed
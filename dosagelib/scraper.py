@@ -1,12 +1,14 @@
 # -*- coding: iso-8859-1 -*-
 # Copyright (C) 2004-2005 Tristan Seligmann and Jonathan Jacobs
 # Copyright (C) 2012-2013 Bastian Kleineidam
-import requests
 import time
-from . import loader, configuration
+import os
+from . import loader, configuration, director, util, registry, fileutil
 from .util import (fetchUrl, fetchUrls, getPageContent, makeSequence,
-  get_system_uid, urlopen)
+  get_system_uid, urlopen, getIndexRange, getDirname)
 from .comic import ComicStrip
+from .nameindex import NameIndex
+from .session import SessionPool
 from .output import out
 from .events import getHandler
 
@@ -68,14 +70,14 @@ class _BasicScraper(object):
     # wait time between downloading comic strips
     waitSeconds = 0
 
-    # HTTP session storing cookies
-    session = requests.session()
+    # HTTP sessions with one connection pool per host, storing cookies
+    session = SessionPool()
 
     def __init__(self, indexes=None):
         """Initialize internal variables."""
         self.urls = set()
         if indexes:
-            self.indexes = tuple(sorted(indexes))
+            self.indexes = tuple(self.expandIndexes(indexes))
         else:
             self.indexes = tuple()
         self.skippedUrls = set()
@@ -96,6 +98,32 @@ class _BasicScraper(object):
         """Get hash value from name and index list."""
         return hash((self.getName(), self.indexes))
 
+    @classmethod
+    def expandIndexes(cls, indexes):
+        """Expand index ranges of the form first..last in the given
+        indexes, keeping the order of the indexes and ranges.
+        @raises: ValueError if a range is not supported or empty
+        """
+        expanded = []
+        for index in indexes:
+            if '..' in index:
+                first, last = index.split('..', 1)
+                rangeIndexes = cls.getIndexRange(first, last)
+                if not rangeIndexes:
+                    raise ValueError("empty index range %s" % index)
+                expanded.extend(rangeIndexes)
+            else:
+                expanded.append(index)
+        return expanded
+
+    @classmethod
+    def getIndexRange(cls, first, last):
+        """Get all indexes from first to last, including both. The default
+        implementation supports numbers and dates.
+        @raises: ValueError if the index range is not supported
+        """
+        return getIndexRange(first, last)
+
     def shouldSkipUrl(self, url):
         """Determine if search for images in given URL should be skipped."""
         return False
@@ -115,8 +143,9 @@ class _BasicScraper(object):
             out.warn("found no images at %s with patterns %s" % (url, patterns))
         return ComicStrip(self.getName(), url, imageUrls, self.namer, self.session)
 
-    def getStrips(self, maxstrips=None):
-        """Get comic strips."""
+    def getStrips(self, maxstrips=None, isKnownPage=None):
+        """Get comic strips. If isKnownPage is given, the traversal stops
+        before fetching a previous page URL for which it returns True."""
         if maxstrips:
             word = "strip" if maxstrips == 1 else "strips"
             msg = 'Retrieving %d %s' % (maxstrips, word)
@@ -125,35 +154,69 @@ class _BasicScraper(object):
         if self.indexes:
             if len(self.indexes) == 1:
                 msg += " for index %s" % self.indexes[0]
+            elif len(self.indexes) > 10:
+                msg += " for %d indexes" % len(self.indexes)
             else:
-                msg += " for indexes %s" % self.indexes
+                msg += " for indexes %s" % (self.indexes,)
             urls = [self.getIndexStripUrl(index) for index in self.indexes]
         else:
             urls = [self.getLatestUrl()]
         if self.adult:
             msg += " (including adult content)"
         out.info(msg)
-        for url in urls:
-            for strip in self.getStripsFor(url, maxstrips):
-                yield strip
+        numthreads = util.MaxHostConnections
+        if maxstrips == 1 and len(urls) > 1 and numthreads > 1 and not self.waitSeconds:
+            # fetch the index pages in parallel
+            failed = 0
+            for page in director.imap(self.getIndexPage, urls, numthreads):
+                if page is None:
+                    failed += 1
+                else:
+                    for strip in self.getPageStrips(*page):
+                        yield strip
+            if failed:
+                # report the errors after the strips of the other pages
+                raise IOError("Could not get %d of %d strip pages" % (failed, len(urls)))
+        else:
+            for url in urls:
+                for strip in self.getStripsFor(url, maxstrips, isKnownPage):
+                    yield strip
+
+    def getIndexPage(self, url):
+        """Get URL, content and base URL of a comic strip page. On errors
+        a warning is printed and None is returned."""
+        out.info('Get strip URL %s' % url, level=1)
+        try:
+            data, baseUrl = getPageContent(url, self.session)
+        except (IOError, ValueError) as msg:
+            out.warn("Could not get strip page %s: %s" % (url, msg))
+            return None
+        return url, data, baseUrl
+
+    def getPageStrips(self, url, data, baseUrl):
+        """Get the comic strip of one page, unless the URL should be skipped."""
+        if self.shouldSkipUrl(url):
+            out.info('Skipping URL %s' % url)
+            self.skippedUrls.add(url)
+        else:
+            try:
+                yield self.getComicStrip(url, data, baseUrl)
+            except ValueError as msg:
+                # image not found
+                out.exception(msg)
 
-    def getStripsFor(self, url, maxstrips):
+    def getStripsFor(self, url, maxstrips, isKnownPage=None):
         """Get comic strips for an URL. If maxstrips is a positive number, stop after
-        retrieving the given number of strips."""
+        retrieving the given number of strips. If isKnownPage is given, stop
+        before fetching a previous page URL for which it returns True."""
         self.hitFirstStripUrl = False
         seen_urls = set()
         while url:
             out.info('Get strip URL %s' % url, level=1)
-            data, baseUrl = getPageContent(url, self.session)
-            if self.shouldSkipUrl(url):
-                out.info('Skipping URL %s' % url)
-                self.skippedUrls.add(url)
-            else:
-                try:
-                    yield self.getComicStrip(url, data, baseUrl)
-                except ValueError as msg:
-                    # image not found
-                    out.exception(msg)
+            data, baseUrl = getPageContent(url, self.session,
+              stopSearches=self.getStopSearches())
+            for strip in self.getPageStrips(url, data, baseUrl):
+                yield strip
             if self.firstStripUrl == url:
                 out.debug("Stop at first URL %s" % url)
                 self.hitFirstStripUrl = True
@@ -168,10 +231,29 @@ class _BasicScraper(object):
                 # avoid recursive URL loops
                 out.warn("Already seen previous URL %r" % prevUrl)
                 break
+            if prevUrl and isKnownPage is not None and isKnownPage(prevUrl):
+                out.info("Stop retrieval because page %s has already been saved" % prevUrl)
+                break
             url = prevUrl
             if url and self.waitSeconds:
                 time.sleep(self.waitSeconds)
 
+    def getStopSearches(self):
+        """Get the URL searches after whose matches the download of a
+        strip page can be stopped if util.StreamPages is set.
+        @return: the image and previous URL searches, or None if the
+          whole page is needed
+        @rtype: tuple or None
+        """
+        if (not util.StreamPages or self.multipleImagesPerStrip or
+            not self.imageSearch or not self.prevSearch):
+            return None
+        # scrapers searching the page otherwise need all of it
+        for name in ('getComicStrip', 'getPrevUrl'):
+            if getattr(type(self), name) != getattr(_BasicScraper, name):
+                return None
+        return (self.imageSearch, self.prevSearch)
+
     def getPrevUrl(self, url, data, baseUrl):
         """Find previous URL."""
         prevUrl = None
@@ -241,44 +323,90 @@ class _BasicScraper(object):
 def find_scraperclasses(comic, multiple_allowed=False):
     """Get a list comic scraper classes. Can return more than one entries if
     multiple_allowed is True, else it raises a ValueError if multiple
-    modules match. The match is a case insensitive substring search."""
+    modules match. The match is a case insensitive substring search.
+    If an up-to-date comic registry is available, only the modules of
+    the matching scrapers are imported."""
     if not comic:
         raise ValueError("empty comic name")
-    candidates = []
-    cname = comic.lower()
-    for scraperclass in get_scraperclasses():
-        lname = scraperclass.getName().lower()
-        if lname == cname:
-            # perfect match
-            if not multiple_allowed:
-                return [scraperclass]
-            else:
-                candidates.append(scraperclass)
-        elif cname in lname:
-            candidates.append(scraperclass)
-    if len(candidates) > 1 and not multiple_allowed:
-        comics = ", ".join(x.getName() for x in candidates)
-        raise ValueError('multiple comics found: %s' % comics)
-    elif not candidates:
-        raise ValueError('comic %r not found' % comic)
-    return candidates
+    reg = registry.getRegistry()
+    if _scraperclasses is None and reg is not None:
+        nameindex = reg.getNameIndex()
+        if nameindex is not None:
+            entries = nameindex.find(comic, multiple_allowed=multiple_allowed)
+            scraperclasses = registry.loadScraperclasses(entries)
+            if scraperclasses is not None:
+                return scraperclasses
+            out.debug("Comic registry is out of date")
+            reg.invalidate()
+    return get_nameindex().find(comic, multiple_allowed=multiple_allowed)
+
+
+def find_existing_scraperclasses(basepath):
+    """Get all comic scraper classes whose comic directory exists in the
+    given base path. If an up-to-date comic registry is available, only
+    the modules of the found scrapers are imported."""
+    reg = registry.getRegistry()
+    if _scraperclasses is None and reg is not None:
+        entries = reg.load()
+        if entries is not None:
+            scraperclasses = registry.loadScraperclasses(filter_existing(basepath, entries))
+            if scraperclasses is not None:
+                return scraperclasses
+            out.debug("Comic registry is out of date")
+            reg.invalidate()
+    return filter_existing(basepath, get_scraperclasses())
+
+
+def filter_existing(basepath, scrapers):
+    """Get the scrapers whose comic directory exists in the given base
+    path. Instead of testing each comic directory, the base path and the
+    directories of comic families like GoComics/ are listed once."""
+    names = [scraper.getName() for scraper in scrapers]
+    families = set(os.path.normcase(name.split('/', 1)[0]) for name in names if '/' in name)
+    dirnames = set()
+    for dirname in fileutil.get_subdirs(basepath):
+        dirnames.add(os.path.normcase(dirname))
+        if os.path.normcase(dirname) in families:
+            for subdir in fileutil.get_subdirs(os.path.join(basepath, dirname)):
+                dirnames.add(os.path.normcase(os.path.join(dirname, subdir)))
+    return [scraper for scraper, name in zip(scrapers, names)
+            if os.path.normcase(getDirname(name)) in dirnames]
+
+
+_nameindex = None
+def get_nameindex():
+    """Get the name index of all comic scraper classes.
+    The result is cached.
+    @return: name index
+    @rtype: NameIndex
+    """
+    global _nameindex
+    if _nameindex is None:
+        _nameindex = NameIndex(get_scraperclasses())
+    return _nameindex
 
 
 _scraperclasses = None
 def get_scraperclasses():
     """Find all comic scraper classes in the plugins directory.
-    The result is cached.
+    The result is cached and written to the comic registry.
     @return: list of _BasicScraper classes
     @rtype: list of _BasicScraper
     """
     global _scraperclasses
     if _scraperclasses is None:
         out.debug("Loading comic modules...")
-        modules = loader.get_modules()
-        plugins = loader.get_plugins(modules, _BasicScraper)
-        _scraperclasses = list(plugins)
+        # scraper classes with the name of their defining module
+        plugins = []
+        for module in loader.get_modules():
+            for scraperclass in loader.get_module_plugins(module, _BasicScraper):
+                plugins.append((module.__name__, scraperclass))
+        _scraperclasses = [scraperclass for modname, scraperclass in plugins]
         check_scrapers()
         out.debug("... %d modules loaded." % len(_scraperclasses))
+        reg = registry.getRegistry()
+        if reg is not None and reg.load() is None:
+            reg.save(plugins)
     return _scraperclasses
 
 
@@ -297,3 +425,37 @@ def check_scrapers():
 def make_scraper(classname, **attributes):
     """Make a new scraper class with given name and attributes."""
     return type(classname, (_BasicScraper,), attributes)
+
+
+class LazyScraper(loader.LazyPlugin):
+    """Placeholder for a generated scraper class. The name, URL, adult
+    flag, language and description are stored in the placeholder, so
+    comics can be listed and searched without creating their classes."""
+
+    __slots__ = ('name', 'url', 'adult', 'lang', 'description')
+
+    baseclass = _BasicScraper
+
+    def __init__(self, classname, factory, args, name, url, adult=_BasicScraper.adult,
+                 lang=_BasicScraper.lang, description=_BasicScraper.description):
+        """Store scraper metadata and the arguments to create the
+        scraper class with factory(*args, **metadata)."""
+        super(LazyScraper, self).__init__(classname, factory, args)
+        self.name = name
+        self.url = url
+        self.adult = adult
+        self.lang = lang
+        self.description = description
+
+    def create(self):
+        """Create the scraper class. The metadata is passed to the factory
+        as keyword arguments, so it only has to be given once.
+        @return: the scraper class
+        @rtype: class
+        """
+        return self.factory(*self.args, name=self.name, url=self.url,
+          adult=self.adult, lang=self.lang, description=self.description)
+
+    def getName(self):
+        """Get scraper name."""
+        return self.name
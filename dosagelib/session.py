@@ -0,0 +1,149 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+"""
+HTTP sessions with one connection pool per host.
+"""
+import threading
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+import requests
+from . import util
+from .output import out
+from .fileutil import has_module
+
+# Keep connections open for further requests to the same host
+KeepAlive = True
+
+# Transport for HTTPS connections, see set_transport()
+Transport = 'http1'
+
+# HTTP/2 support needs the hyper module
+has_hyper = has_module("hyper.contrib")
+
+
+def getHttp1Adapter(maxsize):
+    """Get a HTTP/1.1 transport adapter with a connection pool of the
+    given size."""
+    return requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=maxsize)
+
+
+def getHttp2Adapter(maxsize):
+    """Get a transport adapter sending all requests to one host over a
+    single HTTP/2 connection. The hyper module falls back to HTTP/1.1 when
+    the server does not support HTTP/2. Since hyper connections are not
+    thread-safe, an adapter must only be used by one thread; SessionPool
+    creates a separate session for each thread. The pool size is ignored,
+    since the adapter has exactly one connection per host."""
+    from hyper.contrib import HTTP20Adapter
+    return HTTP20Adapter()
+
+
+# Transport adapter factories by name
+Transports = {
+    'http1': getHttp1Adapter,
+    'http2': getHttp2Adapter,
+}
+
+
+def set_transport(name):
+    """Set the transport for HTTPS connections. Only affects sessions
+    created afterwards. HTTP connections always use HTTP/1.1 since
+    servers negotiate HTTP/2 only with TLS."""
+    global Transport
+    if name not in Transports:
+        raise ValueError("unknown transport %r" % name)
+    if name == 'http2' and not has_hyper:
+        raise ValueError("HTTP/2 support needs the Python hyper module")
+    Transport = name
+
+
+def set_keepalive(keepalive):
+    """Set if connections are kept open for further requests. Only
+    affects sessions created afterwards."""
+    global KeepAlive
+    KeepAlive = keepalive
+
+
+class SessionPool(object):
+    """Provide the get() and post() methods and the cookies attribute of
+    a requests session, using a separate session for each thread and
+    host. Since requests sessions are not guaranteed to be thread-safe,
+    parallel threads never share a session. The session of a thread
+    for one host keeps a pool of up to util.MaxHostConnections
+    connections for reuse. The transport adapter of HTTPS connections is
+    pluggable, see set_transport(). All sessions share one thread-safe
+    cookie jar."""
+
+    def __init__(self, maxsize=None):
+        """Initialize cookies and the session tables. The pool size
+        defaults to the maximum number of connections per host."""
+        self.maxsize = maxsize
+        self.cookies = requests.cookies.RequestsCookieJar()
+        # sessions of the current thread by scheme and host
+        self.local = threading.local()
+        # tuples (thread, session) of all sessions, so they can be closed
+        self.sessions = []
+        self.lock = threading.Lock()
+
+    def getSession(self, url):
+        """Get the session of the current thread for the host of the
+        given URL."""
+        scheme, host = urlsplit(url)[:2]
+        key = (scheme.lower(), host.lower())
+        sessions = getattr(self.local, 'sessions', None)
+        if sessions is None:
+            sessions = self.local.sessions = {}
+        if key not in sessions:
+            sessions[key] = self.newSession()
+        return sessions[key]
+
+    def addSession(self, session):
+        """Register a new session of the current thread and close the
+        sessions of finished threads."""
+        with self.lock:
+            finished = [sess for thread, sess in self.sessions if not thread.is_alive()]
+            self.sessions = [(thread, sess) for thread, sess in self.sessions if thread.is_alive()]
+            self.sessions.append((threading.current_thread(), session))
+        closeSessions(finished)
+
+    def newSession(self):
+        """Create a session with its own connection pool."""
+        session = requests.session()
+        session.cookies = self.cookies
+        if hasattr(requests, 'adapters'):
+            # requests >= 1.0
+            maxsize = self.maxsize or util.MaxHostConnections
+            session.mount('http://', getHttp1Adapter(maxsize))
+            session.mount('https://', Transports[Transport](maxsize))
+        if not KeepAlive:
+            session.headers['Connection'] = 'close'
+        self.addSession(session)
+        return session
+
+    def get(self, url, **kwargs):
+        """Send a GET request with the session of the URL host."""
+        return self.getSession(url).get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Send a POST request with the session of the URL host."""
+        return self.getSession(url).post(url, **kwargs)
+
+    def close(self):
+        """Close the sessions of all threads and their connections."""
+        with self.lock:
+            sessions = [sess for thread, sess in self.sessions]
+            self.sessions = []
+            # threads create new sessions on their next request
+            self.local = threading.local()
+        closeSessions(sessions)
+
+
+def closeSessions(sessions):
+    """Close the given sessions and their connections."""
+    for session in sessions:
+        try:
+            session.close()
+        except Exception as msg:
+            out.debug("Could not close session: %s" % msg)
@@ -0,0 +1,133 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+"""
+Store which comic strips have been saved in a base directory.
+"""
+import os
+import json
+import codecs
+import sqlite3
+import threading
+from .output import out
+from .util import getDirname
+
+# Name of the state database file in the base directory
+StateFilename = 'dosage.sqlite'
+
+# Seconds to wait for other processes writing to the database
+LockTimeoutSecs = 30
+
+
+class StripState(object):
+    """Record the saved images of each comic strip page in a SQLite
+    database, so that already saved strips can be detected without
+    requesting their images again."""
+
+    def __init__(self, basepath):
+        """Set the base directory. The database is opened on first use."""
+        self.basepath = basepath
+        self.filename = os.path.join(basepath, StateFilename)
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def connect(self):
+        """Open the database and create the table if needed. Must be called
+        with the lock held."""
+        if self.conn is None:
+            if not os.path.isdir(self.basepath):
+                os.makedirs(self.basepath)
+            out.debug("Opening strip state database %s" % self.filename)
+            self.conn = sqlite3.connect(self.filename, timeout=LockTimeoutSecs, check_same_thread=False)
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS images (
+                comic TEXT NOT NULL,
+                pageurl TEXT NOT NULL,
+                imageurl TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                sha1 TEXT,
+                PRIMARY KEY (comic, pageurl, imageurl))""")
+            self.conn.commit()
+        return self.conn
+
+    def addImages(self, comic, pageUrl, images):
+        """Record the saved images of a comic strip page.
+        @param images: tuples (imageUrl, filename, size, sha1) with the
+          filename relative to the base directory
+        @ptype images: list of tuple
+        """
+        with self.lock:
+            conn = self.connect()
+            conn.executemany("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)",
+                [(comic, pageUrl) + tuple(image) for image in images])
+            conn.commit()
+
+    def hasImages(self, comic, pageUrl, imageUrls):
+        """Check if all given images of a comic strip page have been saved
+        and their files still exist."""
+        if not imageUrls or not os.path.isfile(self.filename):
+            return False
+        with self.lock:
+            conn = self.connect()
+            rows = conn.execute("SELECT imageurl, filename, size FROM images WHERE comic=? AND pageurl=?",
+                (comic, pageUrl)).fetchall()
+        saved = dict((imageUrl, (filename, size)) for imageUrl, filename, size in rows)
+        for imageUrl in imageUrls:
+            if imageUrl not in saved:
+                return False
+        return self.filesExist(saved.values())
+
+    def hasPage(self, comic, pageUrl):
+        """Check if images of the given comic strip page have been saved
+        and their files still exist."""
+        if not os.path.isfile(self.filename):
+            return False
+        with self.lock:
+            conn = self.connect()
+            rows = conn.execute("SELECT filename, size FROM images WHERE comic=? AND pageurl=?",
+                (comic, pageUrl)).fetchall()
+        return bool(rows) and self.filesExist(rows)
+
+    def filesExist(self, files):
+        """Check if the given files exist with the given sizes.
+        @param files: tuples (filename, size) with the filename relative
+          to the base directory
+        @ptype files: iterable of tuple
+        """
+        for filename, size in files:
+            fn = os.path.join(self.basepath, filename)
+            if not os.path.isfile(fn) or os.path.getsize(fn) != size:
+                return False
+        return True
+
+    def hasStrip(self, strip):
+        """Check if all images of the given comic strip have been saved."""
+        imageUrls = [image.url for image in strip.getImages()]
+        return self.hasImages(strip.name, strip.stripUrl, imageUrls)
+
+    def close(self):
+        """Close the database."""
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+def getJsonPages(basepath, comic):
+    """Get the URLs of the comic strip pages recorded in the dosage.json
+    file of the JSON event handler whose image files still exist.
+    @return: page URLs
+    @rtype: set of string
+    """
+    dirname = os.path.join(basepath, getDirname(comic))
+    try:
+        with codecs.open(os.path.join(dirname, 'dosage.json'), 'r', 'utf-8') as f:
+            data = json.load(f)
+        filenames = set(os.listdir(dirname))
+    except (IOError, OSError, ValueError):
+        return set()
+    pages = set()
+    for url, pageInfo in data.get('pages', {}).items():
+        images = pageInfo.get('images')
+        if images and all(name in filenames for name in images.values()):
+            pages.add(url)
+    return pages
@@ -22,30 +22,74 @@ import re
 import traceback
 import time
 import subprocess
+import threading
+import datetime
+import random
+import email.utils
+import codecs
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
 try:
     from HTMLParser import HTMLParser
 except ImportError:
     from html.parser import HTMLParser
-from .decorators import memoized
+from .decorators import memoized, lru_memoized
 from .output import out
+from .cache import getPageCache, getRobotsCache
 from .configuration import UserAgent, AppName, App, SupportUrl
 from .languages import Iso2Language
 
 # Maximum content size for HTML pages
 MaxContentBytes = 1024 * 1024 * 2 # 2 MB
 
+# Stop downloading strip pages when the image and previous links are
+# found, see set_stream_pages()
+StreamPages = False
+
+# Size of the chunks in which streamed pages are read and searched
+PageChunkBytes = 1024 * 16
+
+# Bytes of text that must follow a match before a streamed page is closed,
+# so that the pattern could not have matched differently with more text
+StreamMarginBytes = 1024
+
+# Maximum length of a match spanning chunks of a streamed page
+MaxMatchBytes = 1024 * 4
+
 # Maximum content size for images
 MaxImageBytes = 1024 * 1024 * 20 # 20 MB
 
 # Default number of retries
 MaxRetries = 3
 
-# Time to pause between retries
-RetryPauseSeconds = 5
+# Pause before the first retry, doubled for each further retry
+RetryBackoffSeconds = 2
+
+# Maximum pause between retries; a longer Retry-After header of the
+# server is not waited for
+MaxRetryPauseSeconds = 60
+
+# HTTP status codes of responses that are retried
+RetryStatusCodes = frozenset((408, 429, 500, 502, 503, 504))
 
 # Default connection timeout
 ConnectionTimeoutSecs = 60
 
+# Maximum number of parallel connections to one host
+MaxHostConnections = 4
+
+# Accepted content encodings for HTML pages
+PageAcceptEncoding = 'gzip, deflate'
+
+# Images are already compressed, and their file size can be compared
+# with the content length when they are sent uncompressed
+ImageAcceptEncoding = 'identity'
+
+# Maximum number of requests per second to one host (None means no limit)
+MaxHostRequestsPerSecond = None
+
 # The character set to encode non-ASCII characters in a URL. See also
 # http://tools.ietf.org/html/rfc2396#section-2.1
 # Note that the encoding is not really specified, but most browsers
@@ -177,6 +221,25 @@ def case_insensitive_re(name):
 
 baseSearch = re.compile(tagre("base", "href", '([^"]*)'))
 
+# End of the HTML head: the closing head tag or the opening body tag
+headEndSearch = re.compile(r'<\s*(?:/\s*head|body)[\s>]', re.IGNORECASE)
+
+def getBaseUrl(data, url):
+    """Get the URL of the <base href> tag, or the given URL if the page
+    has none. Since the base tag belongs into the HTML head, only the
+    head is searched. Pages without head or body tag are searched
+    completely.
+    @return: base URL
+    @rtype: string
+    """
+    match = headEndSearch.search(data)
+    end = match.start() if match else len(data)
+    match = baseSearch.search(data, 0, end)
+    if match:
+        return match.group(1)
+    return url
+
+
 def isValidPageContent(data):
     """Check if page content is empty or has error messages."""
     # The python requests library sometimes returns empty data.
@@ -184,37 +247,134 @@ def isValidPageContent(data):
     return data and not data.startswith("Internal Server Error")
 
 
-def getPageContent(url, session, max_content_bytes=MaxContentBytes):
-    """Get text content of given URL."""
+def set_stream_pages(stream):
+    """Set if strip pages are only downloaded until the image and previous
+    page links have been found."""
+    global StreamPages
+    StreamPages = stream
+
+
+def getPageContent(url, session, max_content_bytes=MaxContentBytes, stopSearches=None):
+    """Get text content of given URL. If stopSearches is given, the page
+    is streamed and closed as soon as the first pattern of each of the
+    URL searches has matched, see readPageText()."""
     check_robotstxt(url, session)
-    # read page data
-    try:
-        page = urlopen(url, session, max_content_bytes=max_content_bytes)
-    except IOError:
-        page = urlopen(url, session, max_content_bytes=max_content_bytes)
-    data = page.text
-    tries = MaxRetries
-    while not isValidPageContent(data) and tries > 0:
-        time.sleep(RetryPauseSeconds)
-        page = urlopen(url, session, max_content_bytes=max_content_bytes)
-        data = page.text
-        tries -= 1
+    # read page data; failed requests are retried by urlopen()
+    data = getPageText(url, session, max_content_bytes, stopSearches)
+    tries = 0
+    while not isValidPageContent(data) and tries < MaxRetries:
+        time.sleep(getRetryPause(tries))
+        data = getPageText(url, session, max_content_bytes, stopSearches)
+        tries += 1
     if not isValidPageContent(data):
         raise ValueError("Got invalid page content from %s: %r" % (url, data))
     out.debug("Got page content %r" % data, level=3)
-    # determine base URL
-    baseUrl = None
-    match = baseSearch.search(data)
-    if match:
-        baseUrl = match.group(1)
+    return data, getBaseUrl(data, url)
+
+
+def getPageText(url, session, max_content_bytes, stopSearches=None):
+    """Get text of given URL. If the page cache is enabled, a cached page
+    is validated with a conditional request and reused if the server
+    reports that it has not been modified. Pages that are read only
+    partially because of stopSearches are not cached."""
+    pagecache = getPageCache()
+    entry = None
+    headers = {}
+    if pagecache is not None:
+        entry = pagecache.get(url)
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['lastmodified']:
+                headers['If-Modified-Since'] = entry['lastmodified']
+    stream = bool(stopSearches)
+    page = urlopen(url, session, max_content_bytes=max_content_bytes, headers=headers,
+      stream=stream)
+    if page.status_code == 304 and entry is not None:
+        out.debug('Using cached content of unmodified page %s' % url)
+        page.close()
+        return entry['text']
+    if stream:
+        data, complete = readPageText(page, max_content_bytes, stopSearches)
     else:
-        baseUrl = url
-    return data, baseUrl
+        data, complete = page.text, True
+    if pagecache is not None and complete and isValidPageContent(data):
+        etag = page.headers.get('etag')
+        lastmodified = page.headers.get('last-modified')
+        if etag or lastmodified:
+            pagecache.put(url, etag, lastmodified, data)
+    return data
+
+
+def readPageText(page, max_content_bytes, stopSearches):
+    """Read the text of a streamed response until the first pattern of
+    each of the given URL searches has matched or max_content_bytes have
+    been read. The response is closed afterwards.
+    @return: tuple (text, flag if the whole page has been read)
+    @rtype: tuple
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(page.encoding or 'utf-8')('replace')
+    except LookupError:
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+    pagesearch = PageSearch(stopSearches)
+    text = u''
+    size = 0
+    complete = True
+    try:
+        for chunk in page.iter_content(PageChunkBytes):
+            size += len(chunk)
+            text += decoder.decode(chunk)
+            if max_content_bytes and size >= max_content_bytes:
+                out.debug('Stop reading page %s at %d bytes' % (page.url, size))
+                complete = False
+                break
+            if pagesearch.found(text):
+                out.debug('Stop reading page %s after matches at %d bytes' % (page.url, size))
+                complete = False
+                break
+        else:
+            text += decoder.decode(b'', True)
+    finally:
+        page.close()
+    return text, complete
+
+
+class PageSearch(object):
+    """Search the first pattern of URL searches in the growing text of a
+    streamed page. Later patterns of a search sequence are only used by
+    fetchUrls() when the first pattern does not match anywhere in the
+    page, so only a match of the first pattern allows to stop reading."""
+
+    def __init__(self, urlSearches):
+        """Initialize the patterns that have not matched yet."""
+        self.searches = [makeSequence(urlSearch)[0] for urlSearch in urlSearches]
+        self.searched = 0
+
+    def found(self, text):
+        """Search the text that has been added since the last call.
+        @return: True if all patterns have matched
+        @rtype: bool
+        """
+        end = len(text) - StreamMarginBytes
+        if end <= self.searched:
+            return False
+        start = max(0, self.searched - MaxMatchBytes)
+        searches = []
+        for search in self.searches:
+            match = search.search(text, start)
+            if match is None or match.end() > end:
+                searches.append(search)
+        self.searches = searches
+        self.searched = end
+        return not searches
 
 
 def getImageObject(url, referrer, session, max_content_bytes=MaxImageBytes):
     """Get response object for given image URL."""
-    return urlopen(url, session, referrer=referrer, max_content_bytes=max_content_bytes, stream=True)
+    headers = {'Accept-Encoding': ImageAcceptEncoding}
+    return urlopen(url, session, referrer=referrer, max_content_bytes=max_content_bytes,
+      stream=True, headers=headers)
 
 
 def makeSequence(item):
@@ -225,11 +385,114 @@ def makeSequence(item):
     return (item,)
 
 
+# Minimum length of literal texts used to skip pattern searches
+MinRequiredLiteral = 3
+
+# Cache of required literals by compiled pattern
+_required_literals = {}
+
+def getRequiredLiterals(search):
+    """Get literal texts that every match of the given compiled pattern
+    contains. Texts made of case insensitive character classes like [aA]
+    are returned in lowercase.
+    @return: tuples (text, ignorecase)
+    @rtype: tuple of tuple
+    """
+    try:
+        return _required_literals[search]
+    except KeyError:
+        pass
+    literals = []
+    if not search.flags & re.IGNORECASE:
+        try:
+            items = sre_parse.parse(search.pattern, search.flags)
+        except Exception:
+            items = []
+        for text, ignorecase in _iter_literal_runs(items):
+            if len(text) >= MinRequiredLiteral:
+                literals.append((text, ignorecase))
+    _required_literals[search] = literals = tuple(literals)
+    return literals
+
+
+def _get_ascii_case_pair(av):
+    """Get the lowercase letter of a character class [aA], or None."""
+    chars = set(value for op, value in av if op == sre_parse.LITERAL)
+    if len(chars) != 2 or len(av) != 2:
+        return None
+    lower, upper = sorted(chars, reverse=True)
+    if lower < 128 and chr(lower).islower() and chr(lower).upper() == chr(upper):
+        return chr(lower)
+    return None
+
+
+def _iter_literal_runs(items):
+    """Yield runs of consecutive ASCII literals of a parsed pattern. Only
+    sequences and groups are followed; any other element ends a run. A run
+    also ends where the case sensitivity changes, so that each run consists
+    either only of case insensitive or only of case sensitive characters."""
+    run = []
+    ignorecase = False
+    for text, ci in _iter_literal_chars(items):
+        if run and (text is None or ci != ignorecase):
+            yield "".join(run), ignorecase
+            run = []
+        if text is not None:
+            run.append(text)
+            ignorecase = ci
+    if run:
+        yield "".join(run), ignorecase
+
+
+def _iter_literal_chars(items):
+    """Yield tuples (char, ignorecase) of the required characters of a
+    parsed pattern, or (None, False) at positions where a run of literal
+    characters ends."""
+    for op, av in items:
+        if op == sre_parse.LITERAL and av < 128:
+            yield chr(av), False
+        elif op == sre_parse.IN and _get_ascii_case_pair(av):
+            yield _get_ascii_case_pair(av), True
+        elif op == sre_parse.SUBPATTERN:
+            if len(av) == 4 and (av[1] | av[2]) & re.IGNORECASE:
+                # scoped flags like (?i:...) change the case sensitivity
+                yield None, False
+            else:
+                # the last element is the group content
+                for item in _iter_literal_chars(av[-1]):
+                    yield item
+        else:
+            yield None, False
+
+
+def canMatch(search, data, lowerdata):
+    """Check if the data contains the required literals of the given
+    compiled pattern. If not, the pattern can not match.
+    @param lowerdata: the data in lowercase, only used if the pattern
+      has case insensitive literals
+    @return: False if the pattern can not match, else True
+    @rtype: bool
+    """
+    for text, ignorecase in getRequiredLiterals(search):
+        if text not in (lowerdata if ignorecase else data):
+            return False
+    return True
+
+
 def fetchUrls(url, data, baseUrl, urlSearch):
-    """Search all entries for given URL pattern(s) in a HTML page."""
+    """Search all entries for given URL pattern(s) in a HTML page.
+    Patterns whose required literal texts are missing in the page are
+    skipped without scanning it."""
     searchUrls = []
     searches = makeSequence(urlSearch)
+    # the lowercase page is only made for case insensitive literals
+    lowerdata = None
     for search in searches:
+        if lowerdata is None and any(ignorecase for text, ignorecase in getRequiredLiterals(search)):
+            lowerdata = data.lower()
+        if not canMatch(search, data, lowerdata):
+            out.debug('skipped pattern %s missing required text' % search.pattern)
+            continue
         for match in search.finditer(data):
             searchUrl = match.group(1)
             if not searchUrl:
@@ -258,11 +521,28 @@ def unescape(text):
 
 _nopathquote_chars = "-;/=,~*+()@!"
 
+# Maximum number of cached normalised URLs
+MaxNormalisedURLs = 10000
+
+# Absolute URLs that normaliseURL() does not change: no HTML entities,
+# no leading empty or dot path segment, no empty parameters or query,
+# no fragment and no whitespace or control characters
+_normalurl = re.compile(r'https?://[^\x00-\x20/?#&;]+/(?![/.])[^\x00-\x20?#&;]*(?:\?[^\x00-\x20#&;]+)?$')
+
 def normaliseURL(url):
     """Removes any leading empty segments to avoid breaking urllib2; also replaces
-    HTML entities and character references.
+    HTML entities and character references. URLs that are already normal
+    are returned unchanged, others are normalised with a cache.
     """
     url = unicode_safe(url)
+    if _normalurl.match(url):
+        return url
+    return _normaliseURL(url)
+
+
+@lru_memoized(MaxNormalisedURLs)
+def _normaliseURL(url):
+    """Normalise the given Unicode URL, see normaliseURL()."""
     # XXX: brutal hack
     url = unescape(url)
 
@@ -297,29 +577,161 @@ def check_robotstxt(url, session):
 
 @memoized
 def get_robotstxt_parser(url, session=None):
-    """Get a RobotFileParser for the given robots.txt URL."""
+    """Get a RobotFileParser for the given robots.txt URL. The robots.txt
+    rules are taken from the robots.txt cache if it is enabled."""
     rp = robotparser.RobotFileParser()
-    try:
-        req = urlopen(url, session, max_content_bytes=MaxContentBytes, raise_for_status=False)
-    except Exception:
-        # connect or timeout errors are treated as an absent robotst.txt
-        rp.allow_all = True
+    robotscache = getRobotsCache()
+    entry = None
+    if robotscache is not None:
+        entry = robotscache.get(url)
+    if entry is not None:
+        out.debug('Using cached robots.txt %s' % url)
+        status, lines = entry['status'], entry['lines']
     else:
-        if req.status_code in (401, 403):
-            rp.disallow_all = True
-        elif req.status_code >= 400:
-            rp.allow_all = True
-        elif req.status_code == 200:
-            rp.parse(req.text.splitlines())
+        try:
+            req = urlopen(url, session, max_content_bytes=MaxContentBytes, raise_for_status=False)
+        except Exception:
+            # connect or timeout errors are treated as an absent robotst.txt
+            status, lines = None, []
+        else:
+            status = req.status_code
+            if status == 200:
+                lines = req.text.splitlines()
+            else:
+                lines = []
+            if robotscache is not None:
+                robotscache.put(url, status, lines, req.headers)
+    if status is None:
+        rp.allow_all = True
+    elif status in (401, 403):
+        rp.disallow_all = True
+    elif status >= 400:
+        rp.allow_all = True
+    elif status == 200:
+        rp.parse(lines)
     return rp
 
 
+class HostLimiter(object):
+    """Limit the number of parallel connections and the request rate
+    for one host. The request rate is enforced with a token bucket
+    that allows short bursts of up to one second worth of requests."""
+
+    def __init__(self, maxconnections, rate=None):
+        """Initialize connection semaphore and token bucket."""
+        self.semaphore = threading.BoundedSemaphore(maxconnections)
+        self.rate = rate
+        if rate:
+            self.maxtokens = max(rate, 1)
+        else:
+            self.maxtokens = 1
+        self.tokens = self.maxtokens
+        self.stamp = time.time()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Wait until a request token is available."""
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.time()
+                self.tokens = min(self.maxtokens, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+    def acquire(self):
+        """Acquire a connection slot and a request token."""
+        self.semaphore.acquire()
+        try:
+            self.wait()
+        except:
+            self.semaphore.release()
+            raise
+
+    def release(self):
+        """Release the connection slot."""
+        self.semaphore.release()
+
+    def __enter__(self):
+        """Acquire a connection slot and a request token."""
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        """Release the connection slot."""
+        self.release()
+
+
+def releaseOnClose(response, limiter):
+    """Release the connection slot of the given host limiter when the
+    streamed response is closed for the first time."""
+    close = response.close
+    released = []
+    def closeAndRelease():
+        """Close the response and release the connection slot."""
+        try:
+            close()
+        finally:
+            if not released:
+                released.append(True)
+                limiter.release()
+    response.close = closeAndRelease
+
+
+_host_limiters = {}
+_host_limiters_lock = threading.Lock()
+
+def get_host_limiter(host):
+    """Get the connection limiter for the given host."""
+    with _host_limiters_lock:
+        if host not in _host_limiters:
+            _host_limiters[host] = HostLimiter(MaxHostConnections, rate=MaxHostRequestsPerSecond)
+        return _host_limiters[host]
+
+
+def set_host_limits(maxconnections=None, rate=None):
+    """Set the maximum number of parallel connections and requests per
+    second for each host. None values leave the current setting unchanged.
+    @raises: ValueError for less than one connection or a rate that is
+      not positive"""
+    global MaxHostConnections, MaxHostRequestsPerSecond
+    if maxconnections is not None and maxconnections < 1:
+        raise ValueError("maximum number of host connections must be at least 1, got %d" % maxconnections)
+    if rate is not None and rate <= 0:
+        raise ValueError("maximum host request rate must be positive, got %s" % rate)
+    with _host_limiters_lock:
+        if maxconnections is not None:
+            MaxHostConnections = maxconnections
+        if rate is not None:
+            MaxHostRequestsPerSecond = rate
+        _host_limiters.clear()
+
+
+def get_hostname(url):
+    """Get lowercase host part (including the port) of given URL."""
+    return urlsplit(url)[1].lower()
+
+
 def urlopen(url, session, referrer=None, max_content_bytes=None,
             timeout=ConnectionTimeoutSecs, raise_for_status=True,
-            stream=False, data=None):
-    """Open an URL and return the response object."""
+            stream=False, data=None, headers=None):
+    """Open an URL and return the response object. The number of parallel
+    connections and the request rate to the URL host are limited, see
+    set_host_limits(). Streamed responses keep their connection slot
+    until they are closed, so callers must always close them.
+    Timeouts, aborted connections and responses with a status code in
+    RetryStatusCodes are retried up to MaxRetries times, see
+    getRetryPause(). POST requests are not idempotent and are sent only
+    once."""
     out.debug('Open URL %s' % url)
-    headers = {'User-Agent': UserAgent}
+    headers = dict(headers or {})
+    headers['User-Agent'] = UserAgent
+    headers.setdefault('Accept-Encoding', PageAcceptEncoding)
     if referrer:
         headers['Referer'] = referrer
     out.debug('Sending headers %s' % headers, level=3)
@@ -341,16 +753,97 @@ def urlopen(url, session, referrer=None, max_content_bytes=None,
         kwargs['data'] = data
         func = session.post
         out.debug('Sending POST data %s' % data, level=3)
+    maxretries = MaxRetries if data is None else 0
+    limiter = get_host_limiter(get_hostname(url))
+    tries = 0
+    while True:
+        limiter.acquire()
+        try:
+            req = func(url, **kwargs)
+        except requests.exceptions.RequestException as err:
+            limiter.release()
+            msg = 'URL retrieval of %s failed: %s' % (url, err)
+            if tries >= maxretries or not isTransientError(err):
+                raise IOError(msg)
+            pause = getRetryPause(tries)
+        except:
+            limiter.release()
+            raise
+        else:
+            if stream:
+                releaseOnClose(req, limiter)
+            else:
+                limiter.release()
+            if req.status_code not in RetryStatusCodes or tries >= maxretries:
+                break
+            msg = 'URL retrieval of %s failed with status %d' % (url, req.status_code)
+            pause = getRetryPause(tries, getRetryAfter(req.headers.get('retry-after')))
+            if pause is None:
+                break
+            req.close()
+        tries += 1
+        out.warn('%s, retry %d in %.1f seconds' % (msg, tries, pause))
+        time.sleep(pause)
     try:
-        req = func(url, **kwargs)
         out.debug('Response cookies: %s' % req.cookies)
         check_content_size(url, req.headers, max_content_bytes)
         if raise_for_status:
             req.raise_for_status()
         return req
     except requests.exceptions.RequestException as err:
+        req.close()
         msg = 'URL retrieval of %s failed: %s' % (url, err)
         raise IOError(msg)
+    except:
+        req.close()
+        raise
+
+
+def isTransientError(err):
+    """Check if a failed request should be retried. Timeouts and aborted
+    connections are retried, but not connections that could not be
+    established, for example because of an unknown host name."""
+    if isinstance(err, requests.exceptions.Timeout):
+        return True
+    if isinstance(err, requests.exceptions.ConnectionError):
+        reason = getattr(err.args[0], 'reason', None) if err.args else None
+        return type(reason).__name__ != 'NewConnectionError'
+    return False
+
+
+def getRetryAfter(value):
+    """Get the seconds to wait from a Retry-After header value, which
+    can be a number of seconds or a HTTP date.
+    @return: seconds or None if the value is missing or invalid
+    @rtype: float or None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(parsed) - time.time())
+
+
+def getRetryPause(tries, retryafter=None):
+    """Get the seconds to wait before retrying a request that already
+    has been retried the given number of times. The pause grows
+    exponentially from RetryBackoffSeconds up to MaxRetryPauseSeconds,
+    with a random jitter so that parallel downloads do not retry at the
+    same time. A Retry-After time of the server is honoured.
+    @return: seconds or None if the server asks to wait longer than
+      MaxRetryPauseSeconds
+    @rtype: float or None
+    """
+    if retryafter is not None:
+        if retryafter > MaxRetryPauseSeconds:
+            return None
+        return retryafter + random.uniform(0, RetryBackoffSeconds)
+    pause = min(MaxRetryPauseSeconds, RetryBackoffSeconds * 2 ** tries)
+    return pause / 2 + random.uniform(0, pause / 2)
 
 
 def check_content_size(url, headers, max_content_bytes):
@@ -390,6 +883,42 @@ def getRelativePath(basepath, path):
     return os.path.join(*path)
 
 
+_dateIndex = re.compile(r"^(\d{4})([-/.]?)(\d{2})\2(\d{2})$")
+
+def getIndexRange(first, last):
+    """Get all comic strip indexes from first to last, including both.
+    Supported are numbers (eg. 1..500, keeping leading zeros of the first
+    number) and dates (eg. 2012/01/01..2012/12/31, with the separators of
+    the first date).
+    @raises: ValueError if the index range is not supported
+    @return: the indexes
+    @rtype: list of string
+    """
+    mo1 = _dateIndex.match(first)
+    mo2 = _dateIndex.match(last)
+    if mo1 and mo2 and mo1.group(2) == mo2.group(2):
+        sep = mo1.group(2)
+        try:
+            day = datetime.date(*(int(mo1.group(i)) for i in (1, 3, 4)))
+            lastday = datetime.date(*(int(mo2.group(i)) for i in (1, 3, 4)))
+        except ValueError:
+            # no valid dates, but eg. eight-digit numbers
+            pass
+        else:
+            indexes = []
+            while day <= lastday:
+                indexes.append("%04d%s%02d%s%02d" % (day.year, sep, day.month, sep, day.day))
+                day += datetime.timedelta(days=1)
+            return indexes
+    if first.isdigit() and last.isdigit():
+        if first.startswith('0') and len(first) > 1:
+            width = len(first)
+        else:
+            width = 0
+        return ["%0*d" % (width, i) for i in range(int(first), int(last) + 1)]
+    raise ValueError("unsupported index range %s..%s" % (first, last))
+
+
 def getQueryParams(url):
     """Get URL query parameters."""
     query = urlsplit(url)[3]
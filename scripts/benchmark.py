@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# Copyright (C) 2013 Bastian Kleineidam
+"""
+Script to measure the speed of page processing functions. Usage:
+benchmark.py [directory-with-saved-html-pages...]
+Without arguments generated example pages are used.
+"""
+from __future__ import print_function
+import sys
+import os
+import codecs
+import glob
+import json
+import timeit
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from dosagelib.util import (fetchUrls, makeSequence, baseSearch, getBaseUrl,
+  normaliseURL, _normaliseURL)
+from dosagelib.plugins import smackjeeves
+
+# number of runs of each benchmark
+repeat = 5
+
+
+def load_urls():
+    """Load all URLs of the JSON files in the script directory. Relative
+    URLs are joined with an example host."""
+    urls = []
+    for filename in sorted(glob.glob(os.path.join(os.path.dirname(__file__), "*.json"))):
+        with open(filename) as f:
+            add_urls(json.load(f), urls)
+    return urls
+
+
+def add_urls(data, urls):
+    """Add all URL strings of the given JSON data to the URL list."""
+    if isinstance(data, dict):
+        data = list(data.values())
+    if isinstance(data, list):
+        for item in data:
+            add_urls(item, urls)
+    elif isinstance(data, type(u"")):
+        if data.startswith(("http://", "https://")):
+            urls.append(data)
+        elif data.startswith("/"):
+            urls.append(u"http://www.example.com" + data)
+
+
+def load_pages(dirnames):
+    """Load all HTML pages in the given directories."""
+    pages = []
+    for dirname in dirnames:
+        for filename in sorted(os.listdir(dirname)):
+            if filename.endswith((".html", ".htm")):
+                with codecs.open(os.path.join(dirname, filename), 'r', 'utf-8', 'replace') as f:
+                    pages.append(f.read())
+    return pages
+
+
+def make_pages():
+    """Generate SmackJeeves like pages with long comment sections and
+    different kinds of previous links."""
+    comments = "\n".join('<div class="c%d"><a href="http://x.smackjeeves.com/user/%d">user %d</a>'
+      ' <p>some comment text &amp; stuff</p></div>' % (i, i, i) for i in range(2000))
+    link = '<a href="http://foo.smackjeeves.com/comics/12345/bar/">%s</a>'
+    prevlinks = [
+        '<img src="/images/back.png" alt="Back">',
+        ' Atras<',
+        '<img src="/images/prev.jpg">',
+        'no link',
+    ]
+    return ['<html><head><title>x</title></head><body>%s%s</body></html>' %
+            (link % prevlink, comments) for prevlink in prevlinks]
+
+
+def search_all(data, urlSearch):
+    """Search the patterns one after another without skipping any."""
+    for search in makeSequence(urlSearch):
+        urls = [match.group(1) for match in search.finditer(data)]
+        if urls:
+            return urls
+    return []
+
+
+def search_fetch(data, urlSearch):
+    """Search the patterns with fetchUrls()."""
+    try:
+        return fetchUrls('http://foo.smackjeeves.com/', data, 'http://foo.smackjeeves.com/', urlSearch)
+    except ValueError:
+        return []
+
+
+def base_all(data):
+    """Search the base URL in the whole page."""
+    match = baseSearch.search(data)
+    return match.group(1) if match else None
+
+
+def base_head(data):
+    """Search the base URL with getBaseUrl()."""
+    return getBaseUrl(data, None)
+
+
+def normalise_all(urls):
+    """Normalise all URLs without the fast path and the cache."""
+    for url in urls:
+        _normaliseURL.func(url)
+
+
+def normalise_cached(urls):
+    """Normalise all URLs with normaliseURL()."""
+    for url in urls:
+        normaliseURL(url)
+
+
+def bench(name, func, pages, *args):
+    """Print the best time of calling func for all pages."""
+    def run():
+        for page in pages:
+            func(page, *args)
+    best = min(timeit.repeat(run, number=1, repeat=repeat))
+    print("%-30s %8.2f ms" % (name, best * 1000))
+
+
+def main(args):
+    """Run all benchmarks."""
+    pages = load_pages(args) if args else make_pages()
+    print("%d pages" % len(pages))
+    for name, urlSearch in (("prev", smackjeeves._prevSearch), ("next", smackjeeves._nextSearch)):
+        bench("search %s patterns" % name, search_all, pages, urlSearch)
+        bench("fetchUrls %s patterns" % name, search_fetch, pages, urlSearch)
+    bench("search base URL", base_all, pages)
+    bench("getBaseUrl", base_head, pages)
+    urls = load_urls()
+    print("%d URLs" % len(urls))
+    # each URL is normalised when found in a page and when its image is saved
+    urls = urls + urls
+    bench("normalise URLs", normalise_all, [urls])
+    bench("normaliseURL", normalise_cached, [urls])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,84 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+import os
+import time
+import shutil
+import tempfile
+from binascii import hexlify
+from unittest import TestCase
+from dosagelib import cache
+
+
+class TestPageCache(TestCase):
+    """Test the page cache."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_get_put(self):
+        pagecache = cache.PageCache(self.tmpdir)
+        url = u'http://example.com/page1'
+        self.assertEqual(pagecache.get(url), None)
+        pagecache.put(url, u'"abc"', None, u'<html>\xe4</html>')
+        entry = pagecache.get(url)
+        self.assertEqual(entry['etag'], u'"abc"')
+        self.assertEqual(entry['lastmodified'], None)
+        self.assertEqual(entry['text'], u'<html>\xe4</html>')
+
+    def test_evict(self):
+        pagecache = cache.PageCache(self.tmpdir, maxbytes=1000)
+        urls = [u'http://example.com/page%d' % i for i in range(10)]
+        for i, url in enumerate(urls):
+            # random data does not compress
+            pagecache.put(url, None, u'date', hexlify(os.urandom(100)).decode('ascii'))
+            # make sure modification times differ
+            fn = pagecache.getFilename(url)
+            os.utime(fn, (time.time() - 100 + i, time.time() - 100 + i))
+        self.assertTrue(pagecache.size <= 1000)
+        self.assertEqual(pagecache.get(urls[0]), None)
+        self.assertNotEqual(pagecache.get(urls[-1]), None)
+
+
+class TestRobotsCache(TestCase):
+    """Test the robots.txt cache."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_get_put(self):
+        robotscache = cache.RobotsCache(self.tmpdir)
+        url = u'http://example.com/robots.txt'
+        self.assertEqual(robotscache.get(url), None)
+        robotscache.put(url, 200, [u'User-agent: *', u'Disallow: /'], {})
+        entry = robotscache.get(url)
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(entry['lines'], [u'User-agent: *', u'Disallow: /'])
+
+    def test_expire(self):
+        robotscache = cache.RobotsCache(self.tmpdir, maxage=-1)
+        url1 = u'http://example.com/robots.txt'
+        robotscache.put(url1, 404, [], {'cache-control': 'max-age=60'})
+        self.assertNotEqual(robotscache.get(url1), None)
+        url2 = u'http://example.org/robots.txt'
+        robotscache.put(url2, 404, [], {})
+        self.assertEqual(robotscache.get(url2), None)
+
+    def test_temporary_error(self):
+        robotscache = cache.RobotsCache(self.tmpdir)
+        url = u'http://example.com/robots.txt'
+        for status in (429, 500, 503):
+            robotscache.put(url, status, [], {'cache-control': 'max-age=60'})
+            self.assertEqual(robotscache.get(url), None)
+        robotscache.put(url, 404, [], {})
+        self.assertEqual(robotscache.get(url)['status'], 404)
+
+    def test_maxage(self):
+        self.assertEqual(cache.getMaxAge({}, 10), 10)
+        self.assertEqual(cache.getMaxAge({'cache-control': 'public, max-age=3600'}, 10), 3600)
+        self.assertEqual(cache.getMaxAge({'cache-control': 'no-cache'}, 10), 0)
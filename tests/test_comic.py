@@ -0,0 +1,73 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from dosagelib.comic import ComicImage
+from dosagelib.fileutil import Syncer
+
+
+class TestComicImage(TestCase):
+    """Test comic image downloads."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def make_file(self, name, content=b'data'):
+        with open(os.path.join(self.tmpdir, name), 'wb') as f:
+            f.write(content)
+
+    def test_existing_file(self):
+        image = ComicImage('Comic', 'http://example.com/a.gif', None, 'Comic', 'a.gif', None)
+        self.assertEqual(image.getExistingFile(self.tmpdir), None)
+        self.make_file('a.png', b'')
+        self.assertEqual(image.getExistingFile(self.tmpdir), None)
+        # a different image with the same name is not the saved file
+        self.make_file('a.png')
+        self.assertEqual(image.getExistingFile(self.tmpdir), None)
+        self.make_file('a.gif')
+        self.assertEqual(image.getExistingFile(self.tmpdir), os.path.join(self.tmpdir, 'a.gif'))
+
+    def test_existing_file_without_extension(self):
+        image = ComicImage('Comic', 'http://example.com/a.php', None, 'Comic', 'a.php', None)
+        self.assertEqual(image.getExistingFile(self.tmpdir), None)
+        self.make_file('a.png')
+        self.assertEqual(image.getExistingFile(self.tmpdir), os.path.join(self.tmpdir, 'a.png'))
+        image = ComicImage('Comic', 'http://example.com/a', None, 'Comic', 'a', None)
+        self.assertEqual(image.getExistingFile(self.tmpdir), os.path.join(self.tmpdir, 'a.png'))
+
+    def test_download(self):
+        class Response(object):
+            closed = False
+            def iter_content(self, chunk_size):
+                return iter([b'ab', b'cd'])
+            def close(self):
+                self.closed = True
+        image = ComicImage('Comic', 'http://example.com/a.gif', None, 'Comic', 'a.gif', None)
+        image.urlobj = Response()
+        fn = os.path.join(self.tmpdir, 'a.gif')
+        self.assertEqual(image.download(fn, Syncer()), 4)
+        self.assertTrue(image.urlobj.closed)
+        with open(fn, 'rb') as f:
+            self.assertEqual(f.read(), b'abcd')
+        self.assertEqual(image.sha1, '81fe8bfe87576c3ecb22426f8e57847382917acf')
+        self.assertEqual(os.listdir(self.tmpdir), ['a.gif'])
+        if os.name == 'posix':
+            # saved images have the permissions of files created with open()
+            umask = os.umask(0)
+            os.umask(umask)
+            self.assertEqual(os.stat(fn).st_mode & 0o777, 0o666 & ~umask)
+
+    def test_syncer_batch(self):
+        syncer = Syncer('batch', batchfiles=2)
+        for name in ('a.png', 'b.png', 'c.png'):
+            self.make_file(name)
+            syncer.add(os.path.join(self.tmpdir, name))
+        self.assertEqual(syncer.pending, [os.path.join(self.tmpdir, 'c.png')])
+        syncer.flush()
+        self.assertEqual(syncer.pending, [])
+        self.assertRaises(ValueError, Syncer, 'sometimes')
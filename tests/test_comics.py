@@ -5,30 +5,11 @@ import tempfile
 import shutil
 import re
 import os
-import multiprocessing
-import urlparse
 from itertools import islice
 from unittest import TestCase
 from dosagelib import scraper
 
 
-def get_host(url):
-    """Get host part of URL."""
-    return urlparse.urlsplit(url)[1].lower()
-
-
-# Dictionary with per-host locks.
-_locks = {}
-# Allowed number of connections per host
-MaxConnections = 4
-
-def get_lock(host):
-    """Get bounded semphore for given host."""
-    if host not in _locks:
-        _locks[host] = multiprocessing.BoundedSemaphore(MaxConnections)
-    return _locks[host]
-
-
 class _ComicTester(TestCase):
     """Basic comic test class."""
     scraperclass=None
@@ -51,15 +32,10 @@ class _ComicTester(TestCase):
         # Test a scraper. It must be able to traverse backward for
         # at least 5 strips from the start, and find strip images
         # on at least 4 pages.
+        # The number of connections to one host is limited by
+        # dosagelib.util.urlopen().
         scraperobj = self.scraperclass()
-        # Limit number of connections to one host.
-        host = get_host(scraperobj.url)
-        try:
-            with get_lock(host):
-                self._test_comic(scraperobj)
-        except OSError:
-            # interprocess lock not supported
-            self._test_comic(scraperobj)
+        self._test_comic(scraperobj)
 
     def _test_comic(self, scraperobj):
         num_strips = 0
@@ -0,0 +1,39 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+from unittest import TestCase
+from dosagelib.decorators import lru_memoized
+
+
+class LRUMemoizedTest(TestCase):
+    """
+    Tests for the LRU cache decorator.
+    """
+
+    def setUp(self):
+        self.calls = []
+        @lru_memoized(2)
+        def double(x):
+            self.calls.append(x)
+            return x * 2
+        self.double = double
+
+    def test_cache(self):
+        self.assertEqual(self.double(1), 2)
+        self.assertEqual(self.double(1), 2)
+        self.assertEqual(self.calls, [1])
+
+    def test_maxsize(self):
+        self.double(1)
+        self.double(2)
+        # 1 is now the most recently used argument
+        self.double(1)
+        self.double(3)
+        self.assertEqual(list(self.double.cache.keys()), [(1,), (3,)])
+        self.double(2)
+        self.assertEqual(self.calls, [1, 2, 3, 2])
+
+    def test_uncachable(self):
+        self.assertEqual(self.double([1]), [1, 1])
+        self.assertEqual(self.double([1]), [1, 1])
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(len(self.double.cache), 0)
@@ -0,0 +1,77 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+import threading
+from unittest import TestCase
+from dosagelib import director
+from dosagelib.output import out
+
+
+class TestDirector(TestCase):
+    """Test parallel comic jobs."""
+
+    def test_run_sequential(self):
+        done = []
+        errors = director.run(lambda x: done.append(x) or 1, range(5))
+        self.assertEqual(errors, 5)
+        self.assertEqual(done, list(range(5)))
+
+    def test_run_parallel(self):
+        done = []
+        def func(x):
+            done.append(x)
+            return x % 2
+        errors = director.run(func, range(10), numjobs=4)
+        self.assertEqual(errors, 5)
+        self.assertEqual(sorted(done), list(range(10)))
+
+    def test_output_context(self):
+        contexts = {}
+        def func(x):
+            out.context = x
+            threading.Event().wait(0.01)
+            contexts[x] = out.context
+            return 0
+        director.run(func, ["a", "b", "c"], numjobs=3)
+        self.assertEqual(contexts, {"a": "a", "b": "b", "c": "c"})
+
+    def test_strip_saver(self):
+        saver = director.StripSaver(lambda strip: (strip % 2, strip == 3), 2)
+        results = []
+        for strip in range(6):
+            saver.put(strip)
+            results.extend(saver.getResults())
+        results.extend(saver.close())
+        self.assertEqual(len(results), 6)
+        self.assertEqual(sum(errors for errors, skipped in results), 3)
+        self.assertEqual(sum(skipped for errors, skipped in results), 1)
+
+    def test_imap(self):
+        result = list(director.imap(lambda x: x * 2, range(20), 4))
+        self.assertEqual(result, [x * 2 for x in range(20)])
+
+    def test_imap_error(self):
+        def func(x):
+            if x == 3:
+                raise ValueError(x)
+            return x
+        result = []
+        try:
+            for x in director.imap(func, range(10), 3):
+                result.append(x)
+        except ValueError:
+            pass
+        self.assertEqual(result, [0, 1, 2])
+
+    def test_strip_saver_pool(self):
+        pool = director.WorkerPool(2)
+        savers = [director.StripSaver(lambda strip: (strip % 2, False), 2, pool=pool)
+                  for dummy in range(3)]
+        results = []
+        for strip in range(4):
+            for saver in savers:
+                saver.put(strip)
+        for saver in savers:
+            results.append(saver.close())
+        pool.close()
+        self.assertEqual([len(result) for result in results], [4, 4, 4])
+        self.assertEqual(sum(errors for result in results for errors, skipped in result), 6)
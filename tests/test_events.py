@@ -0,0 +1,46 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+import os
+import codecs
+import shutil
+import tempfile
+from unittest import TestCase
+from dosagelib import events
+
+
+class Comic(object):
+    """Fake comic image."""
+
+    def __init__(self, name, referrer):
+        self.name = name
+        self.referrer = referrer
+
+
+class HtmlEventHandlerTest(TestCase):
+    """
+    Tests for the HTML output.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_interleaved(self):
+        handler = events.HtmlEventHandler(self.tmpdir, 'http://example.com/')
+        handler.start()
+        # downloads of comics in parallel threads
+        for name, page, image in (('A', 'a1', 'A/1.png'), ('B', 'b1', 'B/1.png'),
+                                  ('A', 'a2', 'A/2.png'), ('A', 'a1', 'A/1b.png')):
+            handler.comicDownloaded(Comic(name, 'http://a/%s' % page),
+              os.path.join(self.tmpdir, image))
+        handler.end()
+        filename = os.listdir(os.path.join(self.tmpdir, 'html'))[0]
+        with codecs.open(os.path.join(self.tmpdir, 'html', filename), 'r', 'utf-8') as f:
+            html = f.read()
+        self.assertEqual(html.count(u'<li>A</li>'), 1)
+        self.assertEqual(html.count(u'<li>B</li>'), 1)
+        self.assertTrue(html.index(u'A/2.png') < html.index(u'<li>B</li>'))
+        self.assertEqual(html.count(u'<li><a href="http://a/a1">'), 1)
+        self.assertTrue(html.index(u'A/1b.png') < html.index(u'A/2.png'))
@@ -0,0 +1,43 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+from unittest import TestCase
+from dosagelib.nameindex import NameIndex
+
+
+class Named(object):
+    """Object with a name."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def getName(self):
+        return self.name
+
+
+class TestNameIndex(TestCase):
+    """Test the comic name index."""
+
+    def setUp(self):
+        names = ['Calvin', 'GoComics/CalvinandHobbes', 'xkcd', 'Dilbert',
+          'GoComics/DilbertClassics', 'A']
+        self.nameindex = NameIndex(Named(name) for name in names)
+
+    def find(self, comic, multiple_allowed=False):
+        return [x.getName() for x in self.nameindex.find(comic, multiple_allowed=multiple_allowed)]
+
+    def test_exact(self):
+        self.assertEqual(self.find('calvin'), ['Calvin'])
+        self.assertEqual(self.find('XKCD'), ['xkcd'])
+        self.assertEqual(self.find('a'), ['A'])
+
+    def test_substring(self):
+        self.assertEqual(self.find('hobbes'), ['GoComics/CalvinandHobbes'])
+        self.assertEqual(self.find('calvin', multiple_allowed=True),
+          ['Calvin', 'GoComics/CalvinandHobbes'])
+        self.assertEqual(self.find('ic', multiple_allowed=True),
+          ['GoComics/CalvinandHobbes', 'GoComics/DilbertClassics'])
+        self.assertRaises(ValueError, self.find, 'gocomics')
+
+    def test_not_found(self):
+        self.assertRaises(ValueError, self.find, 'garfield')
+        self.assertRaises(ValueError, self.find, 'ckx')
@@ -0,0 +1,65 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+import os
+import json
+import shutil
+import tempfile
+from unittest import TestCase
+from dosagelib import registry, scraper
+
+
+class TestRegistry(TestCase):
+    """Test the comic registry."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'registry.json')
+        # the registry is only used if the scraper classes are not loaded yet
+        self.scraperclasses = scraper._scraperclasses
+        self.nameindex = scraper._nameindex
+        scraper._scraperclasses = scraper._nameindex = None
+
+    def tearDown(self):
+        registry.setRegistry(None)
+        scraper._scraperclasses = self.scraperclasses
+        scraper._nameindex = self.nameindex
+        shutil.rmtree(self.tmpdir)
+
+    def save(self):
+        from dosagelib.plugins import gocomics, x
+        plugins = [(gocomics.__name__, gocomics.GoComics_CalvinandHobbes),
+          (x.__name__, x.xkcd)]
+        reg = registry.Registry(self.filename)
+        reg.save(plugins)
+        return reg
+
+    def test_load(self):
+        reg = self.save()
+        entries = reg.load()
+        self.assertEqual([entry.getName() for entry in entries],
+          ['GoComics/CalvinandHobbes', 'xkcd'])
+        scraperclasses = registry.loadScraperclasses(entries)
+        self.assertEqual([x.getName() for x in scraperclasses],
+          ['GoComics/CalvinandHobbes', 'xkcd'])
+
+    def test_stale(self):
+        self.save()
+        with open(self.filename) as f:
+            data = json.load(f)
+        data['signature'][0] = registry.RegistryVersion - 1
+        with open(self.filename, 'w') as f:
+            json.dump(data, f)
+        self.assertEqual(registry.Registry(self.filename).load(), None)
+
+    def test_find(self):
+        registry.setRegistry(self.save())
+        scraperclasses = scraper.find_scraperclasses('calvinandhobbes')
+        self.assertEqual(scraperclasses[0].getName(), 'GoComics/CalvinandHobbes')
+        try:
+            scraper.find_scraperclasses('Garfield')
+        except ValueError as msg:
+            self.assertEqual(str(msg), "comic 'Garfield' not found")
+        else:
+            self.fail('Garfield is not in the registry')
+        # the comic modules were not searched
+        self.assertEqual(scraper._scraperclasses, None)
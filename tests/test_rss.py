@@ -0,0 +1,74 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+import os
+import time
+import shutil
+import tempfile
+from unittest import TestCase
+from dosagelib import rss
+
+
+class FeedTest(TestCase):
+    """
+    Tests for RSS feeds.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def getFeed(self, maxitems=rss.MaxItems):
+        return rss.Feed(u'Daily Dosage', u'http://example.com/', u'Comics & more',
+          maxitems=maxitems)
+
+    def getTitles(self, feed):
+        return [dict(item)['title'] for item in feed.items]
+
+    def test_order(self):
+        feed = self.getFeed()
+        feed.addItem(u'b', u'http://b', u'B', u'Tue, 02 Jan 2013 00:00:00 GMT')
+        feed.addItem(u'c', u'http://c', u'C', u'Wed, 03 Jan 2013 00:00:00 GMT', append=False)
+        feed.addItem(u'a', u'http://a', u'A', u'Mon, 01 Jan 2013 00:00:00 GMT')
+        self.assertEqual(self.getTitles(feed), [u'c', u'b', u'a'])
+
+    def test_maxitems(self):
+        feed = self.getFeed(maxitems=2)
+        for title in u'abc':
+            feed.addItem(title, u'http://x', u'', u'', append=False)
+        self.assertEqual(self.getTitles(feed), [u'c', u'b'])
+        feed.addItem(u'd', u'http://x', u'', u'')
+        self.assertEqual(self.getTitles(feed), [u'c', u'b'])
+
+    def test_write(self):
+        feed = self.getFeed()
+        date = time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime())
+        feed.addItem(u'a', u'http://a', u'<img src="a.png"/> \xe9', date)
+        xml = feed.getXML()
+        self.assertTrue(b'<description>Comics &amp; more</description>' in xml)
+        self.assertTrue(b'&lt;img src="a.png"/&gt; \xc3\xa9' in xml)
+        filename = os.path.join(self.tmpdir, 'dailydose.rss')
+        feed.write(filename)
+        yesterday = time.localtime(time.time() - 86400 * 2)
+        self.assertEqual(rss.parseFeed(filename, yesterday).getXML(), xml)
+
+    def test_parse_date(self):
+        self.assertEqual(rss.parseDate('Tue, 01 Jan 2013 12:03:04 GMT'), (2013, 1, 1, 12, 3, 4))
+        self.assertRaises(ValueError, rss.parseDate, 'Tue, 01 Foo 2013 12:03:04 GMT')
+
+    def test_parse_stale(self):
+        feed = self.getFeed()
+        for title, date in ((u'new', u'Thu, 03 Jan 2013 00:00:00 GMT'),
+                            (u'old', u'Tue, 01 Jan 2013 00:00:00 GMT'),
+                            (u'wrong', u'Fri, 04 Jan 2013 00:00:00 GMT')):
+            feed.addItem(title, u'http://x', u'', date)
+        filename = os.path.join(self.tmpdir, 'dailydose.rss')
+        feed.write(filename)
+        yesterday = time.strptime('2013-01-02', '%Y-%m-%d')
+        parsed = rss.parseFeed(filename, yesterday)
+        # parsing stops at the first stale item
+        self.assertEqual(self.getTitles(parsed), [u'new'])
+        self.assertEqual(parsed.channel, feed.channel)
+        self.assertEqual(self.getTitles(rss.parseFeed(filename, time.localtime(0))),
+          [u'new', u'old', u'wrong'])
@@ -1,5 +1,8 @@
 # -*- coding: iso-8859-1 -*-
 # Copyright (C) 2013 Bastian Kleineidam
+import os
+import shutil
+import tempfile
 from unittest import TestCase
 from dosagelib import scraper
 
@@ -22,3 +25,68 @@ class ScraperTester(TestCase):
 
     def test_find_scraperclasses_error(self):
         self.assertRaises(ValueError, scraper.find_scraperclasses, "")
+
+    def test_index_range(self):
+        scraperclass = scraper.find_scraperclasses("CalvinAndHobbes")[0]
+        scraperobj = scraperclass(indexes=["2012/01/30..2012/02/02", "2013/01/01"])
+        self.assertEqual(scraperobj.indexes, ("2012/01/30", "2012/01/31",
+          "2012/02/01", "2012/02/02", "2013/01/01"))
+        scraperobj = scraperclass(indexes=["9..11", "1"])
+        self.assertEqual(scraperobj.indexes, ("9", "10", "11", "1"))
+        self.assertRaises(ValueError, scraperclass, indexes=["2012/02/02..2012/01/01"])
+        self.assertRaises(ValueError, scraperclass, indexes=["500..1"])
+
+    def test_index_page_errors(self):
+        class IndexScraper(scraper._BasicScraper):
+            stripUrl = 'http://example.com/%s'
+            def getIndexPage(self, url):
+                if url.endswith('abc'):
+                    return None
+                return url, '', url
+            def getPageStrips(self, url, data, baseUrl):
+                yield url
+        scraperobj = IndexScraper(indexes=['1', 'abc', '2'])
+        strips = []
+        try:
+            for strip in scraperobj.getStrips(1):
+                strips.append(strip)
+        except IOError as msg:
+            self.assertEqual(str(msg), 'Could not get 1 of 3 strip pages')
+        else:
+            self.fail('failed index page was not reported')
+        self.assertEqual(strips, ['http://example.com/1', 'http://example.com/2'])
+
+    def test_lazy_scraper(self):
+        def factory(comicname, **metadata):
+            created.append(comicname)
+            return scraper.make_scraper('Lazy_' + comicname, help='Index format: n', **metadata)
+        created = []
+        lazy = scraper.LazyScraper('Lazy_Test', factory, ('Test',),
+          name='Lazy/Test', url='http://example.com/')
+        self.assertEqual(lazy.getName(), 'Lazy/Test')
+        self.assertEqual(lazy.__name__, 'Lazy_Test')
+        self.assertFalse(lazy.adult)
+        self.assertEqual(created, [])
+        self.assertEqual(lazy.help, 'Index format: n')
+        scraperobj = lazy(indexes=['1'])
+        self.assertEqual(scraperobj.getName(), 'Lazy/Test')
+        self.assertEqual(scraperobj.url, 'http://example.com/')
+        self.assertEqual(created, ['Test'])
+
+    def test_lazy_scraper_metadata(self):
+        for scraperclass in scraper.get_scraperclasses():
+            if isinstance(scraperclass, scraper.LazyScraper):
+                cls = scraperclass.load()
+                for attr in scraper.LazyScraper.__slots__:
+                    self.assertEqual(getattr(scraperclass, attr), getattr(cls, attr))
+                self.assertEqual(scraperclass.__name__, cls.__name__)
+
+    def test_find_existing(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            for dirname in ('xkcd', os.path.join('GoComics', 'CalvinandHobbes'), 'Unknown'):
+                os.makedirs(os.path.join(tmpdir, dirname))
+            names = [x.getName() for x in scraper.find_existing_scraperclasses(tmpdir)]
+            self.assertEqual(sorted(names), ['GoComics/CalvinandHobbes', 'xkcd'])
+        finally:
+            shutil.rmtree(tmpdir)
@@ -0,0 +1,69 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+import threading
+from unittest import TestCase
+from dosagelib import session
+from dosagelib.session import SessionPool
+
+
+class TestSessionPool(TestCase):
+    """Test the per-host session pool."""
+
+    def test_sessions(self):
+        pool = SessionPool(maxsize=2)
+        session1 = pool.getSession('http://example.com/a')
+        self.assertTrue(pool.getSession('http://EXAMPLE.com/b') is session1)
+        session2 = pool.getSession('https://example.com/a')
+        self.assertFalse(session2 is session1)
+        session3 = pool.getSession('http://example.org/')
+        self.assertFalse(session3 is session1)
+        for sess in (session1, session2, session3):
+            self.assertTrue(sess.cookies is pool.cookies)
+        pool.close()
+        self.assertEqual(pool.sessions, [])
+        self.assertFalse(pool.getSession('http://example.com/a') is session1)
+
+    def test_threads(self):
+        pool = SessionPool()
+        session1 = pool.getSession('http://example.com/a')
+        sessions = []
+        def getSession():
+            sessions.append(pool.getSession('http://example.com/a'))
+        thread = threading.Thread(target=getSession)
+        thread.start()
+        thread.join()
+        # each thread has its own session
+        self.assertFalse(sessions[0] is session1)
+        self.assertTrue(sessions[0].cookies is session1.cookies)
+        self.assertEqual(len(pool.sessions), 2)
+        # sessions of finished threads are closed with the next new session
+        pool.getSession('http://example.org/')
+        self.assertEqual([sess for thread, sess in pool.sessions if sess is sessions[0]], [])
+        pool.close()
+
+    def test_transport_threads(self):
+        adapters = []
+        def getAdapter(maxsize):
+            adapters.append(session.getHttp1Adapter(maxsize))
+            return adapters[-1]
+        transport, transports = session.Transport, session.Transports
+        session.Transports = dict(transports, http2=getAdapter)
+        session.Transport = 'http2'
+        try:
+            pool = SessionPool()
+            pool.getSession('https://example.com/')
+            thread = threading.Thread(target=pool.getSession, args=('https://example.com/',))
+            thread.start()
+            thread.join()
+            # HTTP/2 adapters are not shared by threads
+            self.assertEqual(len(adapters), 2)
+            self.assertFalse(adapters[0] is adapters[1])
+            pool.close()
+        finally:
+            session.Transport, session.Transports = transport, transports
+
+    def test_transport(self):
+        self.assertRaises(ValueError, session.set_transport, 'spdy')
+        if not session.has_hyper:
+            self.assertRaises(ValueError, session.set_transport, 'http2')
+        session.set_transport('http1')
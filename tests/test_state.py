@@ -0,0 +1,57 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright (C) 2013 Bastian Kleineidam
+import os
+import json
+import shutil
+import tempfile
+from unittest import TestCase
+from dosagelib.state import StripState, getJsonPages
+
+
+class TestStripState(TestCase):
+    """Test the strip state database."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.tmpdir, 'Comic'))
+        self.fn = os.path.join('Comic', 'image.png')
+        with open(os.path.join(self.tmpdir, self.fn), 'wb') as f:
+            f.write(b'12345')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_images(self):
+        state = StripState(self.tmpdir)
+        pageUrl = u'http://example.com/1'
+        imageUrl = u'http://example.com/1.png'
+        self.assertFalse(state.hasImages(u'Comic', pageUrl, [imageUrl]))
+        state.addImages(u'Comic', pageUrl, [(imageUrl, self.fn, 5, None)])
+        self.assertTrue(state.hasImages(u'Comic', pageUrl, [imageUrl]))
+        self.assertFalse(state.hasImages(u'Comic', pageUrl, [imageUrl, u'http://example.com/2.png']))
+        self.assertFalse(state.hasImages(u'Other', pageUrl, [imageUrl]))
+        state.close()
+        # changed files are not known
+        with open(os.path.join(self.tmpdir, self.fn), 'wb') as f:
+            f.write(b'123')
+        self.assertFalse(StripState(self.tmpdir).hasImages(u'Comic', pageUrl, [imageUrl]))
+
+    def test_page(self):
+        state = StripState(self.tmpdir)
+        pageUrl = u'http://example.com/1'
+        self.assertFalse(state.hasPage(u'Comic', pageUrl))
+        state.addImages(u'Comic', pageUrl, [(u'http://example.com/1.png', self.fn, 5, None)])
+        self.assertTrue(state.hasPage(u'Comic', pageUrl))
+        self.assertFalse(state.hasPage(u'Comic', u'http://example.com/2'))
+        state.close()
+
+    def test_json_pages(self):
+        data = {'pages': {
+            'http://example.com/1': {'images': {'http://example.com/1.png': 'image.png'}},
+            'http://example.com/2': {'images': {'http://example.com/2.png': 'missing.png'}},
+            'http://example.com/3': {'images': {}, 'prev': 'http://example.com/2'},
+        }}
+        with open(os.path.join(self.tmpdir, 'Comic', 'dosage.json'), 'w') as f:
+            json.dump(data, f)
+        self.assertEqual(getJsonPages(self.tmpdir, u'Comic'), set(['http://example.com/1']))
+        self.assertEqual(getJsonPages(self.tmpdir, u'Other'), set())
@@ -2,9 +2,15 @@
 # Copyright (C) 2004-2005 Tristan Seligmann and Jonathan Jacobs
 # Copyright (C) 2012-2013 Bastian Kleineidam
 import re
+import time
+import threading
+import pytest
+import requests
 from unittest import TestCase
 
-from dosagelib.util import normaliseURL, unescape, tagre, get_system_uid
+from dosagelib import util
+from dosagelib.util import (normaliseURL, unescape, tagre, get_system_uid,
+  HostLimiter, get_hostname, getIndexRange)
 
 
 class URLTest(TestCase):
@@ -21,6 +27,53 @@ class URLTest(TestCase):
         # Test URL normalisation.
         self.assertEqual(normaliseURL('http://example.com//bar/baz&amp;baz'),
                          u'http://example.com/bar/baz&baz')
+        self.assertEqual(normaliseURL('http://example.com/../bar?&a=1#x'),
+                         u'http://example.com/bar?a=1')
+        self.assertEqual(normaliseURL('http://example.com'), u'http://example.com/')
+
+    def test_normal(self):
+        # Test URLs that are already normal.
+        for url in (u'http://example.com/', u'https://example.com:80/a/b.png?c=1',
+                    u'http://example.com/.a/', u'http://example.com/a;b'):
+            self.assertEqual(normaliseURL(url), util._normaliseURL.func(url))
+
+
+class BaseUrlTest(TestCase):
+    """
+    Tests for the base URL of pages.
+    """
+
+    def test_head(self):
+        data = '<html><HEAD><base href="http://example.com/b/"></HEAD><body></body></html>'
+        self.assertEqual(util.getBaseUrl(data, 'http://a/'), 'http://example.com/b/')
+        data = '<html><head><title>x</title></head><body><base href="http://example.com/b/">'
+        self.assertEqual(util.getBaseUrl(data, 'http://a/'), 'http://a/')
+
+    def test_no_head(self):
+        data = '<p>text</p><base href="http://example.com/b/">'
+        self.assertEqual(util.getBaseUrl(data, 'http://a/'), 'http://example.com/b/')
+        self.assertEqual(util.getBaseUrl('<p>text</p>', 'http://a/'), 'http://a/')
+
+
+class IndexRangeTest(TestCase):
+    """
+    Tests for index ranges.
+    """
+
+    def test_numbers(self):
+        self.assertEqual(getIndexRange('8', '11'), ['8', '9', '10', '11'])
+        self.assertEqual(getIndexRange('098', '100'), ['098', '099', '100'])
+        self.assertEqual(getIndexRange('5', '4'), [])
+
+    def test_dates(self):
+        self.assertEqual(getIndexRange('2012/02/28', '2012/03/01'),
+          ['2012/02/28', '2012/02/29', '2012/03/01'])
+        self.assertEqual(getIndexRange('20121231', '20130101'),
+          ['20121231', '20130101'])
+
+    def test_error(self):
+        self.assertRaises(ValueError, getIndexRange, 'a', 'b')
+        self.assertRaises(ValueError, getIndexRange, '2012/01/01', '2012-01-02')
 
 
 class RegexTest(TestCase):
@@ -52,6 +105,57 @@ class RegexTest(TestCase):
             self.assertFalse(match, "%s should not match %s" % (matcher.pattern, text))
 
 
+class FetchUrlsTest(TestCase):
+    """
+    Tests for searching URLs with multiple patterns.
+    """
+    Link = tagre("a", "href", r'([^"]*/comics/[^"]*)')
+    Searches = (
+        re.compile(Link + tagre("img", "src", r'[^"]+/back\.png')),
+        re.compile(Link + r'Atras<'),
+        re.compile(Link + r'(?:Prev|Back)<'),
+    )
+
+    def test_required_literals(self):
+        literals = util.getRequiredLiterals(self.Searches[0])
+        self.assertEqual(literals, (('href', True), ('/comics/', False),
+          ('img', True), ('src', True), ('/back.png"', False)))
+        self.assertTrue(('>Atras<', False) in util.getRequiredLiterals(self.Searches[1]))
+        self.assertEqual(util.getRequiredLiterals(re.compile('prev', re.IGNORECASE)), ())
+
+    def test_scoped_flags(self):
+        try:
+            search = re.compile(tagre("img", "src", r'([^"]+)') + r'(?:(?i:next)|zzz)?(?i:next)')
+        except re.error:
+            raise pytest.skip("scoped regular expression flags are not supported")
+        data = '<img src="x.png">NEXT'
+        self.assertTrue(search.search(data))
+        self.assertEqual(util.fetchUrls('http://example.com/', data, 'http://example.com/', search),
+          ['http://example.com/x.png'])
+
+    def test_mixed_case_literals(self):
+        search = re.compile(tagre("img", "src", r'([^"]+)', after=r'Snow[Ff]lame the fan made'))
+        self.assertEqual(util.getRequiredLiterals(search)[-1], ('lame the fan made', False))
+        data = '<img src="/comic/1.png" alt="SnowFlame the fan made comic">'
+        self.assertTrue(search.search(data))
+        self.assertEqual(util.fetchUrls('http://example.com/', data, 'http://example.com/', search),
+          ['http://example.com/comic/1.png'])
+
+    def test_first_pattern_wins(self):
+        data = ('<A HREF="/comics/2">Atras</a><a href="/comics/1">Atras</a>'
+                '<a href="/comics/3"><img src="/i/back.png"></a>')
+        self.assertEqual(util.fetchUrls('http://example.com/', data,
+          'http://example.com/', self.Searches), ['http://example.com/comics/3'])
+        data = '<A HREF="/comics/2">Atras</a><a href="/comics/1">Back</a>'
+        self.assertEqual(util.fetchUrls('http://example.com/', data,
+          'http://example.com/', self.Searches), ['http://example.com/comics/2'])
+
+    def test_not_found(self):
+        data = '<a href="/comics/1">Next</a>'
+        self.assertRaises(ValueError, util.fetchUrls, 'http://example.com/', data,
+          'http://example.com/', self.Searches)
+
+
 class UidTest(TestCase):
     """
     Tests for unique system IDs.
@@ -59,3 +163,236 @@ class UidTest(TestCase):
 
     def test_system_uid(self):
         self.assertTrue(get_system_uid())
+
+
+class HostLimiterTest(TestCase):
+    """
+    Tests for per-host connection limits.
+    """
+
+    def test_hostname(self):
+        self.assertEqual(get_hostname('http://Example.com:8080/a'), 'example.com:8080')
+
+    def test_connections(self):
+        limiter = HostLimiter(2)
+        active = []
+        maxactive = []
+        lock = threading.Lock()
+        def connect():
+            with limiter:
+                with lock:
+                    active.append(1)
+                    maxactive.append(len(active))
+                time.sleep(0.02)
+                with lock:
+                    active.pop()
+        threads = [threading.Thread(target=connect) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max(maxactive), 2)
+
+    def test_rate(self):
+        limiter = HostLimiter(4, rate=20)
+        start = time.time()
+        for i in range(30):
+            with limiter:
+                pass
+        # 20 tokens are available at start, the other 10 take 0.5 seconds
+        self.assertTrue(time.time() - start >= 0.45)
+
+    def test_invalid_limits(self):
+        connections, rate = util.MaxHostConnections, util.MaxHostRequestsPerSecond
+        self.assertRaises(ValueError, util.set_host_limits, maxconnections=0)
+        self.assertRaises(ValueError, util.set_host_limits, rate=0)
+        self.assertRaises(ValueError, util.set_host_limits, rate=-1.5)
+        self.assertEqual(util.MaxHostConnections, connections)
+        self.assertEqual(util.MaxHostRequestsPerSecond, rate)
+
+
+class Response(object):
+    """Fake response object."""
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.cookies = {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(self.status_code)
+
+    def close(self):
+        pass
+
+
+class Session(object):
+    """Fake session returning the given responses."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.cookies = {}
+        self.requests = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    post = get
+
+
+class RetryTest(TestCase):
+    """
+    Tests for retries of failed requests.
+    """
+
+    def setUp(self):
+        self.backoff = util.RetryBackoffSeconds
+        util.RetryBackoffSeconds = 0.01
+
+    def tearDown(self):
+        util.RetryBackoffSeconds = self.backoff
+
+    def test_pause(self):
+        for tries in range(10):
+            pause = util.getRetryPause(tries)
+            maxpause = min(util.MaxRetryPauseSeconds, 0.01 * 2 ** tries)
+            self.assertTrue(maxpause / 2 <= pause <= maxpause)
+        self.assertTrue(3 <= util.getRetryPause(0, 3) <= 3.01)
+        self.assertEqual(util.getRetryPause(0, util.MaxRetryPauseSeconds + 1), None)
+
+    def test_retry_after(self):
+        self.assertEqual(util.getRetryAfter(None), None)
+        self.assertEqual(util.getRetryAfter('120'), 120)
+        self.assertEqual(util.getRetryAfter('Wed, 21 Oct 2015 07:28:00 GMT'), 0)
+        self.assertEqual(util.getRetryAfter('soon'), None)
+
+    def test_retry_status(self):
+        session = Session(Response(503), Response(429, {'retry-after': '0'}), Response(200))
+        response = util.urlopen('http://example.com/', session)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(session.requests, 3)
+
+    def test_no_retry_post(self):
+        session = Session(Response(503), Response(200))
+        self.assertRaises(IOError, util.urlopen, 'http://example.com/', session, data={'a': 'b'})
+        self.assertEqual(session.requests, 1)
+        session = Session(requests.exceptions.Timeout(), Response(200))
+        self.assertRaises(IOError, util.urlopen, 'http://example.com/', session, data={'a': 'b'})
+        self.assertEqual(session.requests, 1)
+
+    def test_no_retry(self):
+        session = Session(Response(404), Response(200))
+        self.assertRaises(IOError, util.urlopen, 'http://example.com/', session)
+        self.assertEqual(session.requests, 1)
+
+    def test_retry_timeout(self):
+        session = Session(*[requests.exceptions.Timeout()] * (util.MaxRetries + 1))
+        self.assertRaises(IOError, util.urlopen, 'http://example.com/', session)
+        self.assertEqual(session.requests, util.MaxRetries + 1)
+
+
+class StreamResponse(Response):
+    """Fake streamed response with the given content."""
+
+    def __init__(self, content, encoding='utf-8'):
+        super(StreamResponse, self).__init__(200)
+        self.url = 'http://example.com/'
+        self.content = content
+        self.encoding = encoding
+        self.read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.content), chunk_size):
+            self.read = i + chunk_size
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class StreamTest(TestCase):
+    """
+    Tests for reading streamed pages.
+    """
+    Searches = (
+        re.compile(tagre("img", "src", r'([^"]*/comic/[^"]*)')),
+        (re.compile(tagre("a", "href", r'([^"]*)', before="prev")),
+         re.compile(tagre("a", "href", r'([^"]*)', before="back"))),
+    )
+    Links = u'<img src="/comic/1.png"><a class="back" href="/0">x</a><a class="prev" href="/1">x</a>'
+    Comments = u'<p>comment \xe9</p>' * 10000
+
+    def test_stop(self):
+        content = (self.Links + self.Comments).encode('utf-8')
+        page = StreamResponse(content)
+        text, complete = util.readPageText(page, util.MaxContentBytes, self.Searches)
+        self.assertFalse(complete)
+        self.assertTrue(page.closed)
+        self.assertTrue(page.read < len(content))
+        self.assertTrue(text.startswith(self.Links))
+        self.assertEqual(util.fetchUrl(page.url, text, page.url, self.Searches[1]),
+          u'http://example.com/1')
+
+    def test_first_pattern(self):
+        # only a match of the first pattern allows to stop
+        content = (self.Links.replace('class="prev"', '') + self.Comments).encode('utf-8')
+        page = StreamResponse(content)
+        text, complete = util.readPageText(page, util.MaxContentBytes, self.Searches)
+        self.assertTrue(complete)
+        self.assertEqual(text, content.decode('utf-8'))
+
+    def test_max_bytes(self):
+        content = self.Comments.encode('utf-8')
+        page = StreamResponse(content)
+        text, complete = util.readPageText(page, util.PageChunkBytes * 2, self.Searches)
+        self.assertFalse(complete)
+        self.assertEqual(page.read, util.PageChunkBytes * 2)
+
+    def test_session(self):
+        content = (self.Links + self.Comments).encode('utf-8')
+        session = Session(StreamResponse(content))
+        text = util.getPageText('http://example.com/', session, util.MaxContentBytes, self.Searches)
+        self.assertTrue(text.startswith(self.Links))
+        self.assertTrue(len(text) < len(self.Links + self.Comments))
+
+
+class StreamLimitTest(TestCase):
+    """
+    Tests for the connection limit of streamed responses.
+    """
+
+    def setUp(self):
+        self.maxconnections = util.MaxHostConnections
+        util.set_host_limits(maxconnections=1)
+
+    def tearDown(self):
+        util.set_host_limits(maxconnections=self.maxconnections)
+
+    def test_stream(self):
+        limiter = util.get_host_limiter('example.com')
+        response = util.urlopen('http://example.com/a.png', Session(Response(200)), stream=True)
+        # the connection slot is held until the response is closed
+        self.assertFalse(limiter.semaphore.acquire(False))
+        response.close()
+        response.close()
+        self.assertTrue(limiter.semaphore.acquire(False))
+        limiter.semaphore.release()
+
+    def test_stream_error(self):
+        limiter = util.get_host_limiter('example.com')
+        self.assertRaises(IOError, util.urlopen, 'http://example.com/a.png',
+          Session(Response(404)), stream=True)
+        self.assertTrue(limiter.semaphore.acquire(False))
+        limiter.semaphore.release()
+
+    def test_no_stream(self):
+        limiter = util.get_host_limiter('example.com')
+        util.urlopen('http://example.com/', Session(Response(200)))
+        self.assertTrue(limiter.semaphore.acquire(False))
+        limiter.semaphore.release()